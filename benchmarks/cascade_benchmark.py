@@ -0,0 +1,83 @@
+"""
+Benchmark da inferência em cascata (predict.py --cascade).
+
+Para cada EDF, roda o caminho completo (Wavelet + modelo em todas as janelas) e
+a cascata (triagem barata + Wavelet/modelo só nas janelas restantes) sobre o
+mesmo sinal pré-processado. Reporta a fração de janelas descartadas, o tempo de
+cada estágio, o ganho no cálculo das probabilidades e de ponta a ponta (leitura
+incluída) e se os eventos detectados mudaram.
+
+Uso (a partir da raiz do projeto):
+    python calibrate_cascade.py --patients chb01 chb02
+    python -m benchmarks.cascade_benchmark arquivo1.edf arquivo2.edf
+"""
+import argparse
+import time
+
+from predict import (MODEL_PATH, SCALER_PATH, SCREENING_PATH, THRESHOLD_CONFIDENCE, MIN_CONSECUTIVE_WINDOWS,
+                     WINDOW_S, STEP_S, load_and_preprocess, compute_probabilities, detect_sustained_events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da inferência em cascata")
+    parser.add_argument("edf_files", nargs="+")
+    parser.add_argument("--screening", type=str, default=SCREENING_PATH)
+    parser.add_argument("--model", type=str, default=MODEL_PATH)
+    parser.add_argument("--scaler", type=str, default=SCALER_PATH)
+    parser.add_argument("--model-format", choices=["auto", "keras", "tflite"], default="auto")
+    args = parser.parse_args()
+
+    from models.runtime import load_predictor, load_scaler
+    from processors.screening import load_screening
+    from helpers.chbmit_helpers import make_windows
+
+    predict, used = load_predictor(args.model, fmt=args.model_format)
+    scaler = load_scaler(args.scaler)
+    screening = load_screening(args.screening)
+    print(f"Modelo: {used} | limiares: {args.screening}")
+
+    totals = {"read": 0.0, "full": 0.0, "cascade": 0.0, "windows": 0, "skipped": 0}
+    rows = []
+    for edf in args.edf_files:
+        t0 = time.perf_counter()
+        raw = load_and_preprocess(edf)
+        t_read = time.perf_counter() - t0
+        windows = make_windows(raw.n_times, raw.info["sfreq"], window_s=WINDOW_S, step_s=STEP_S)
+
+        # Aquecimento (primeira chamada do modelo inclui alocações)
+        compute_probabilities(raw, windows[:8], predict, scaler, verbose=0)
+
+        t0 = time.perf_counter()
+        p_full, _ = compute_probabilities(raw, windows, predict, scaler, verbose=0)
+        t_full = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        p_casc, info = compute_probabilities(raw, windows, predict, scaler, screening=screening, verbose=0)
+        t_casc = time.perf_counter() - t0
+
+        ev_full = detect_sustained_events((p_full > THRESHOLD_CONFIDENCE).astype(int), MIN_CONSECUTIVE_WINDOWS)
+        ev_casc = detect_sustained_events((p_casc > THRESHOLD_CONFIDENCE).astype(int), MIN_CONSECUTIVE_WINDOWS)
+
+        totals["read"] += t_read
+        totals["full"] += t_full
+        totals["cascade"] += t_casc
+        totals["windows"] += len(windows)
+        totals["skipped"] += int(round(info["skipped_fraction"] * len(windows)))
+        rows.append((edf, len(windows), info, t_full, t_casc, ev_full == ev_casc))
+
+    print(f"\n{'arquivo':<28} {'janelas':>8} {'descart.':>9} {'triagem':>8} {'completo':>9} {'cascata':>8} {'ganho':>6}  eventos")
+    for edf, n, info, t_full, t_casc, same in rows:
+        name = edf.replace("\\", "/").rsplit("/", 1)[-1]
+        print(f"{name:<28} {n:>8} {info['skipped_fraction']*100:>8.1f}% {info['screening_s']:>7.2f}s "
+              f"{t_full:>8.2f}s {t_casc:>7.2f}s {t_full / max(t_casc, 1e-9):>5.1f}x  {'iguais' if same else 'DIFERENTES'}")
+
+    skipped = totals["skipped"] / max(totals["windows"], 1)
+    print(f"\nJanelas descartadas na triagem: {skipped*100:.1f}% do cálculo de Wavelet/modelo")
+    print(f"Probabilidades: {totals['full']:.2f}s -> {totals['cascade']:.2f}s "
+          f"({totals['full'] / max(totals['cascade'], 1e-9):.1f}x)")
+    e2e_full = totals["read"] + totals["full"]
+    e2e_casc = totals["read"] + totals["cascade"]
+    print(f"Ponta a ponta (com leitura/filtro): {e2e_full:.2f}s -> {e2e_casc:.2f}s ({e2e_full / max(e2e_casc, 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
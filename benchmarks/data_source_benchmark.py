@@ -0,0 +1,66 @@
+"""
+Benchmark da origem dos dados (Google Drive x espelho local).
+
+Mede, para um paciente, o tempo das buscas de metadados (pasta, EDFs e intervalos
+de crise) e a vazão de leitura dos EDFs pelo backend configurado em data_source.py
+(CHBMIT_BACKEND / CHBMIT_LOCAL_ROOT) ou passado por --backend/--local-root.
+
+Uso (a partir da raiz do projeto):
+    CHBMIT_BACKEND=local CHBMIT_LOCAL_ROOT=/nvme/chbmit python -m benchmarks.data_source_benchmark
+    python -m benchmarks.data_source_benchmark --backend drive --patient chb01 --max-files 3 --mne
+"""
+import argparse
+import hashlib
+import time
+
+from data_source import connect_data_source, DATA_BACKEND
+from helpers.chbmit_helpers import get_patient_folder_id, list_patient_edfs, get_intervals_from_drive
+from utils.drive_utils import open_file_view
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da origem dos dados do CHB-MIT")
+    parser.add_argument("--backend", choices=["drive", "local"], default=None, help="Padrão: CHBMIT_BACKEND")
+    parser.add_argument("--local-root", type=str, default=None, help="Padrão: CHBMIT_LOCAL_ROOT")
+    parser.add_argument("--patient", type=str, default="chb01")
+    parser.add_argument("--max-files", type=int, default=5)
+    parser.add_argument("--mne", action="store_true", help="Inclui leitura + pré-processamento pelo MNE (read_edf_from_drive)")
+    args = parser.parse_args()
+
+    service, root_id = connect_data_source(args.backend, args.local_root)
+    print(f"Fonte de dados: {args.backend or DATA_BACKEND} ({root_id})")
+
+    t0 = time.perf_counter()
+    patient_id = get_patient_folder_id(service, root_id, args.patient)
+    assert patient_id, f"Paciente {args.patient} não encontrado"
+    edfs = list_patient_edfs(service, patient_id)[:args.max_files]
+    for row in edfs:
+        get_intervals_from_drive(service, row["name"], row["seizures_id"], row["summary_id"])
+    t_meta = time.perf_counter() - t0
+    print(f"Metadados: {t_meta:.3f}s ({len(edfs)} EDFs + intervalos)")
+
+    total_bytes = 0
+    t_read = 0.0
+    for row in edfs:
+        t0 = time.perf_counter()
+        with open_file_view(service, row["id"]) as data:
+            # O hash força a leitura de todas as páginas (no espelho local o retorno é mmap)
+            hashlib.md5(data).digest()
+            n_bytes = len(data)
+        dt = time.perf_counter() - t0
+        t_read += dt
+        total_bytes += n_bytes
+        print(f"  {row['name']}: {n_bytes / 1e6:.1f} MB em {dt:.3f}s ({n_bytes / 1e6 / max(dt, 1e-9):.1f} MB/s)")
+    print(f"Leitura bruta: {total_bytes / 1e6:.1f} MB em {t_read:.2f}s ({total_bytes / 1e6 / max(t_read, 1e-9):.1f} MB/s)")
+
+    if args.mne:
+        from readers.chbmit_reader import read_edf_from_drive
+        t0 = time.perf_counter()
+        for row in edfs:
+            read_edf_from_drive(service, row["id"])
+        t_mne = time.perf_counter() - t0
+        print(f"read_edf_from_drive (filtro + resample): {t_mne:.2f}s ({t_mne / max(len(edfs), 1):.2f}s por arquivo)")
+
+
+if __name__ == "__main__":
+    main()
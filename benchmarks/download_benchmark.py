@@ -0,0 +1,129 @@
+"""
+Benchmark do download por intervalos (utils.ranged_download) contra um servidor
+HTTP local que atende requisições Range.
+
+O servidor simula a latência por requisição e o limite de banda por conexão do
+Drive, além de falhas intermitentes (HTTP 503). São comparados o download
+sequencial (uma conexão) e o paralelo com vários tamanhos de pedaço, e por fim
+é exercitada a retomada de um download interrompido.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.download_benchmark
+    python -m benchmarks.download_benchmark --size-mb 64 --bw-mb 10 --fail-rate 0.05
+"""
+import argparse
+import hashlib
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.ranged_download import download_ranges, format_stats
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    # Configurados pelo start_server
+    payload = b""
+    latency_s = 0.0
+    bw_bytes_s = 0.0
+    fail_rate = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency_s)
+        if random.random() < self.fail_rate:
+            self.send_error(503)
+            return
+
+        size = len(self.payload)
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if m:
+            start = int(m.group(1))
+            end = min(int(m.group(2)) if m.group(2) else size - 1, size - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            start, end = 0, size - 1
+            self.send_response(200)
+        body = self.payload[start:end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        # Limite de banda por conexão: envia em blocos com pausa proporcional
+        step = 64 * 1024
+        for i in range(0, len(body), step):
+            piece = body[i:i + step]
+            self.wfile.write(piece)
+            if self.bw_bytes_s:
+                time.sleep(len(piece) / self.bw_bytes_s)
+
+
+def start_server(payload, latency_s, bw_bytes_s, fail_rate):
+    handler = type("Handler", (RangeHandler,), {
+        "payload": payload, "latency_s": latency_s,
+        "bw_bytes_s": bw_bytes_s, "fail_rate": fail_rate,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/arquivo.edf"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de download por intervalos")
+    parser.add_argument("--size-mb", type=float, default=32.0)
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Latência simulada por requisição")
+    parser.add_argument("--bw-mb", type=float, default=8.0, help="Banda simulada por conexão (MB/s, 0 = sem limite)")
+    parser.add_argument("--fail-rate", type=float, default=0.02, help="Fração de requisições que recebem HTTP 503")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--chunk-mb", type=float, nargs="+", default=[1.0, 4.0, 8.0])
+    args = parser.parse_args()
+
+    payload = os.urandom(int(args.size_mb * 1e6))
+    digest = hashlib.sha256(payload).hexdigest()
+    server, url = start_server(payload, args.latency_ms / 1000, args.bw_mb * 1e6, args.fail_rate)
+
+    try:
+        print(f"Arquivo: {len(payload) / 1e6:.1f} MB | latência {args.latency_ms:.0f} ms | "
+              f"banda/conexão {args.bw_mb:.1f} MB/s | falhas {args.fail_rate:.0%}\n")
+
+        # Referência: uma conexão com o arquivo inteiro (como o MediaIoBaseDownload sem retomada)
+        data, stats = download_ranges(url, size=len(payload), chunk_size=len(payload), workers=1, backoff_s=0.05)
+        assert hashlib.sha256(data).hexdigest() == digest
+        base = stats["mb_s"]
+        print(f"{'sequencial':<24} {format_stats(stats)}")
+
+        for chunk_mb in args.chunk_mb:
+            for workers in args.workers:
+                data, stats = download_ranges(url, chunk_size=int(chunk_mb * 1e6), workers=workers, backoff_s=0.05)
+                assert hashlib.sha256(data).hexdigest() == digest
+                label = f"pedaço {chunk_mb:g} MB x{workers}"
+                print(f"{label:<24} {format_stats(stats)}  [{stats['mb_s'] / base:.1f}x]")
+
+        # Retomada: a primeira tentativa desiste na primeira falha, a segunda completa
+        print("\n--- Retomada de download interrompido ---")
+        handler = server.RequestHandlerClass
+        handler.fail_rate = 0.3
+        with tempfile.TemporaryDirectory() as tmp:
+            dest = os.path.join(tmp, "arquivo.edf")
+            try:
+                download_ranges(url, dest=dest, chunk_size=1_000_000, workers=4, retries=0)
+                print("primeira tentativa completou sem falhas (aumente --size-mb)")
+            except Exception as e:
+                print(f"primeira tentativa interrompida: {e}")
+            handler.fail_rate = 0.0
+            _, stats = download_ranges(url, dest=dest, chunk_size=1_000_000, workers=4)
+            with open(dest, "rb") as f:
+                assert hashlib.sha256(f.read()).hexdigest() == digest
+            print(f"retomada: {format_stats(stats)}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark dos extratores de features: Wavelet db4 x potência por banda via FFT.
+
+Mede a vazão da extração (janelas/s e segundos por hora de EEG) nos EDFs dados
+(ou em 1 h de sinal sintético) e o pico de memória da versão FFT para cada
+tamanho de bloco (--chunk-frames). Com --patients, avalia os modelos CNN-LSTM
+treinados com cada extrator (train.py com FEATURE_EXTRACTOR=...) nas mesmas
+gravações: precisão/recall/F1 por janela, sensibilidade, falsos alarmes/h e
+latência por evento.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.feature_benchmark
+    python -m benchmarks.feature_benchmark arquivo1.edf arquivo2.edf --chunk-frames 512 4096 16384
+    CHBMIT_BACKEND=local python -m benchmarks.feature_benchmark --patients chb01 chb02
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from predict import THRESHOLD_CONFIDENCE, MIN_CONSECUTIVE_WINDOWS, WINDOW_S, STEP_S
+from processors.features import FEATURE_EXTRACTORS
+from processors.bandpower import extract_features_bandpower, CHUNK_FRAMES
+
+
+def load_sources(edf_files, seconds):
+    import mne
+    if edf_files:
+        from predict import load_and_preprocess
+        return [(os.path.basename(f), load_and_preprocess(f)) for f in edf_files]
+    # Ruído com escala de EEG (volts), formato do CHB-MIT
+    rng = np.random.default_rng(0)
+    info = mne.create_info(23, 256.0, ch_types="eeg")
+    return [("sintético", mne.io.RawArray(rng.standard_normal((23, int(seconds * 256))) * 20e-6, info, verbose=False))]
+
+
+def time_extractor(extract, raw, windows, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        # Silencia prints/barra de progresso da Wavelet
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            t0 = time.perf_counter()
+            X = extract(raw, windows)
+            best = min(best, time.perf_counter() - t0)
+    return best, X.shape
+
+
+def peak_memory_mb(raw, windows, chunk_frames):
+    data = raw.get_data()  # fora da medição (cópia do MNE)
+    tracemalloc.start()
+    extract_features_bandpower(data, windows, chunk_frames=chunk_frames)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos extratores de features (Wavelet x FFT)")
+    parser.add_argument("edf_files", nargs="*", help="EDFs para medir a vazão (padrão: sinal sintético)")
+    parser.add_argument("--seconds", type=float, default=3600.0, help="Duração do sinal sintético")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--chunk-frames", type=int, nargs="+", default=[128, CHUNK_FRAMES, 4096, 16384])
+    parser.add_argument("--patients", nargs="*", default=None, help="Avalia a detecção nestes pacientes")
+    parser.add_argument("--normal-files", type=int, default=2)
+    parser.add_argument("--model-format", choices=["auto", "keras", "tflite"], default="auto")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD_CONFIDENCE)
+    parser.add_argument("--min-windows", type=int, default=MIN_CONSECUTIVE_WINDOWS)
+    args = parser.parse_args()
+
+    from helpers.chbmit_helpers import make_windows
+
+    print(f"{'arquivo':<24} {'extrator':<10} {'janelas':>8} {'formato':>10} {'s':>7} {'jan/s':>9} {'s por h EEG':>12} {'ganho':>6}")
+    for name, raw in load_sources(args.edf_files, args.seconds):
+        windows = make_windows(raw.n_times, raw.info["sfreq"], window_s=WINDOW_S, step_s=STEP_S)
+        hours = raw.n_times / raw.info["sfreq"] / 3600.0
+        times = {}
+        for feat, extract in FEATURE_EXTRACTORS.items():
+            t, shape = time_extractor(extract, raw, windows, args.repeats)
+            times[feat] = t
+            gain = times["wavelet"] / t if "wavelet" in times else 1.0
+            print(f"{name:<24} {feat:<10} {len(windows):>8} {str(shape[1:]):>10} {t:>7.2f} {len(windows) / t:>9.0f} "
+                  f"{t / hours:>12.2f} {gain:>5.1f}x")
+
+        print(f"\n  Pico de memória da extração FFT ({name}, sem contar o sinal):")
+        for chunk in args.chunk_frames:
+            print(f"    chunk_frames={chunk:>6}: {peak_memory_mb(raw, windows, chunk):>8.1f} MB")
+        print()
+
+    if not args.patients:
+        return
+
+    # --- Detecção: CNN-LSTM treinado com cada extrator ---
+    from models.runtime import artifact_paths, load_predictor, load_scaler
+    from benchmarks.model_zoo_benchmark import load_eval_set, evaluate
+
+    print(f"{'extrator':<10} {'modelo':<40} {'leit.+feat. s':>13} {'prec.':>6} {'recall':>6} {'F1':>6} {'sens.':>6} {'FA/h':>6} {'lat. s':>6}")
+    for feat in FEATURE_EXTRACTORS:
+        model_path, scaler_path, _ = artifact_paths("cnn_lstm", feat)
+        if not os.path.exists(model_path):
+            print(f"{feat:<10} {model_path:<40} (não treinado: FEATURE_EXTRACTOR={feat} python train.py)")
+            continue
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            recordings = load_eval_set(args.patients, args.normal_files, feat)
+        t_load = time.perf_counter() - t0
+        predict, _ = load_predictor(model_path, fmt=args.model_format)
+        m = evaluate(predict, load_scaler(scaler_path), recordings, args.threshold, args.min_windows)
+        print(f"{feat:<10} {model_path:<40} {t_load:>13.2f} {m['precision']:>6.2f} {m['recall']:>6.2f} {m['f1']:>6.2f} "
+              f"{m['sensitivity']:>6.2f} {m['fa_per_hour']:>6.2f} {m['latency_s']:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
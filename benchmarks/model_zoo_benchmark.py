@@ -0,0 +1,180 @@
+"""
+Benchmark das arquiteturas de models/zoo.py (CNN-LSTM, TCN, CNN separável, CNN-GRU, aluno destilado).
+
+Para cada arquitetura reporta o número de parâmetros, a latência em CPU por
+janela (lote de 1, o caso do monitoramento em tempo real) e por lote, e a vazão
+em janelas/s, no formato Keras e/ou TFLite (o mesmo caminho de models.runtime
+usado pelo predict.py). Arquiteturas ainda não treinadas entram só com as
+medidas de custo (pesos aleatórios).
+
+Com --patients, os modelos treinados (artefatos de train.py com MODEL_ARCH=...)
+são avaliados nas mesmas gravações: precisão/recall/F1 por janela e, por evento
+(limiar + janelas consecutivas do predict.py), sensibilidade, falsos alarmes/h
+e latência de detecção.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.model_zoo_benchmark
+    python -m benchmarks.model_zoo_benchmark --archs cnn_lstm tcn student --formats tflite
+    CHBMIT_BACKEND=local python -m benchmarks.model_zoo_benchmark --patients chb01 chb02
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from models.zoo import MODEL_BUILDERS
+from models.runtime import artifact_paths
+from predict import THRESHOLD_CONFIDENCE, MIN_CONSECUTIVE_WINDOWS, WINDOW_S, STEP_S, FEATURES
+
+
+def time_call(fn, X, repeats):
+    fn(X)  # aquecimento (alocações, rastreamento do grafo)
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def load_eval_set(patients, normal_files, features=FEATURES):
+    """Features (sem normalizar) e rótulos por gravação, da fonte de dados configurada."""
+    from data_source import connect_data_source
+    from helpers.chbmit_helpers import get_patient_folder_ids, batch_list_patient_edfs
+    from readers.chbmit_reader import build_windows_and_labels
+    from processors.features import get_feature_extractor
+
+    extract_features = get_feature_extractor(features)
+
+    service, root_id = connect_data_source()
+    patient_ids = get_patient_folder_ids(service, root_id, patients)
+    patient_edfs = batch_list_patient_edfs(service, patient_ids)
+    recordings = []
+    for patient in patients:
+        patient_id = patient_ids.get(patient)
+        if patient_id is None:
+            print(f"  [Skip] Paciente {patient} não encontrado na fonte de dados")
+            continue
+        edfs = patient_edfs[patient]
+        files = [f for f in edfs if f['has_seizures_file']] + [f for f in edfs if not f['has_seizures_file']][:normal_files]
+        for edf_row in files:
+            try:
+                raw, windows, y = build_windows_and_labels(
+                    service, root_id, patient, edf_row["name"],
+                    window_s=WINDOW_S, step_s=STEP_S,
+                    patient_id=patient_id, edf_row=edf_row
+                )
+            except Exception as e:
+                print(f"    [Skip] {edf_row['name']}: {e}")
+                continue
+            if len(windows) > 0:
+                recordings.append((edf_row["name"], extract_features(raw, windows), y))
+    return recordings
+
+
+def evaluate(predict, scaler, recordings, threshold, min_consecutive):
+    from sklearn.metrics import precision_recall_fscore_support
+    from helpers.chbmit_helpers import score_events
+    from predict import detect_sustained_events
+
+    y_all, pred_all = [], []
+    totals = {"n_seizures": 0, "detected": 0, "false_alarms": 0, "hours": 0.0}
+    latencies = []
+    for _, X, y in recordings:
+        N, T, F = X.shape
+        probs = np.asarray(predict(scaler.transform(X.reshape(-1, F)).reshape(N, T, F).astype(np.float32))).flatten()
+        raw_predictions = (probs > threshold).astype(int)
+        ev = score_events(y, detect_sustained_events(raw_predictions, min_consecutive), STEP_S, min_consecutive)
+        for k in totals:
+            totals[k] += ev[k]
+        latencies += ev["latencies_s"]
+        y_all.append(y)
+        pred_all.append(raw_predictions)
+
+    p, r, f1, _ = precision_recall_fscore_support(np.concatenate(y_all), np.concatenate(pred_all),
+                                                  average='binary', zero_division=0)
+    return {
+        "precision": p, "recall": r, "f1": f1,
+        "sensitivity": totals["detected"] / totals["n_seizures"] if totals["n_seizures"] else float("nan"),
+        "fa_per_hour": totals["false_alarms"] / totals["hours"] if totals["hours"] else float("nan"),
+        "latency_s": float(np.median(latencies)) if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das arquiteturas do models/zoo.py")
+    parser.add_argument("--archs", nargs="+", choices=list(MODEL_BUILDERS), default=list(MODEL_BUILDERS))
+    parser.add_argument("--features", choices=["wavelet", "bandpower"], default=FEATURES)
+    parser.add_argument("--formats", nargs="+", choices=["keras", "tflite"], default=["keras", "tflite"])
+    parser.add_argument("--batch", type=int, default=256, help="Tamanho do lote na medida de vazão")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Marca as arquiteturas acima desta latência por janela")
+    parser.add_argument("--patients", nargs="*", default=None, help="Avalia a detecção nestes pacientes")
+    parser.add_argument("--normal-files", type=int, default=2, help="Arquivos sem crise por paciente na avaliação")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD_CONFIDENCE)
+    parser.add_argument("--min-windows", type=int, default=MIN_CONSECUTIVE_WINDOWS)
+    args = parser.parse_args()
+
+    import tensorflow as tf
+    from models.zoo import build_model, count_params
+    from processors.features import feature_input_shape
+    from models.runtime import load_predictor, load_scaler, convert_model_to_tflite, fast_model_path
+
+    recordings = load_eval_set(args.patients, args.normal_files, args.features) if args.patients else []
+    if args.patients:
+        print(f"Avaliação: {len(recordings)} gravações, {sum(len(r[2]) for r in recordings)} janelas\n")
+
+    rng = np.random.default_rng(0)
+    tmp = tempfile.mkdtemp(prefix="zoo_")
+    rows = []
+    for name in args.archs:
+        model_path, scaler_path, _ = artifact_paths(name, args.features)
+        trained = os.path.exists(model_path)
+        if trained:
+            model = tf.keras.models.load_model(model_path, compile=False)
+        else:
+            # Sem treino: só custo (os pesos não importam para a latência)
+            model = build_model(name, feature_input_shape(args.features))
+            model_path = os.path.join(tmp, f"{name}.keras")
+            model.save(model_path)
+        shape = model.input_shape[1:]
+        params = count_params(model)
+
+        X1 = rng.standard_normal((1,) + shape).astype(np.float32)
+        Xb = rng.standard_normal((args.batch,) + shape).astype(np.float32)
+        for fmt in args.formats:
+            if fmt == "tflite":
+                # Converte na pasta temporária (não sobrescreve o .tflite em uso);
+                # load_predictor procura o .tflite ao lado do .keras de referência
+                ref = os.path.join(tmp, f"{name}.keras")
+                convert_model_to_tflite(model_path, fast_model_path(ref))
+                predict, _ = load_predictor(ref, fmt="tflite")
+            else:
+                predict, _ = load_predictor(model_path, fmt="keras")
+            t_win = time_call(predict, X1, args.repeats)
+            t_batch = time_call(predict, Xb, max(3, args.repeats // 4))
+            metrics = None
+            if trained and recordings:
+                metrics = evaluate(predict, load_scaler(scaler_path), recordings, args.threshold, args.min_windows)
+            rows.append((name, fmt, trained, params, t_win, t_batch, args.batch / t_batch, metrics))
+            print(f"  [OK] {name} ({fmt}): {t_win*1000:.2f} ms/janela")
+
+    print(f"\n{'arquitetura':<14} {'formato':<7} {'treinado':>8} {'parâm.':>8} {'ms/jan':>8} "
+          f"{f'ms/lote{args.batch}':>11} {'jan/s':>9} {'prec.':>6} {'recall':>6} {'F1':>6} {'sens.':>6} {'FA/h':>6} {'lat. s':>6}")
+    for name, fmt, trained, params, t_win, t_batch, thr, m in rows:
+        line = (f"{name:<14} {fmt:<7} {'sim' if trained else 'não':>8} {params:>8} {t_win*1000:>8.2f} "
+                f"{t_batch*1000:>11.1f} {thr:>9.0f}")
+        if m:
+            line += (f" {m['precision']:>6.2f} {m['recall']:>6.2f} {m['f1']:>6.2f} {m['sensitivity']:>6.2f} "
+                     f"{m['fa_per_hour']:>6.2f} {m['latency_s']:>6.1f}")
+        else:
+            line += f" {'-':>6} {'-':>6} {'-':>6} {'-':>6} {'-':>6} {'-':>6}"
+        if args.budget_ms is not None and t_win * 1000 > args.budget_ms:
+            line += "  <- acima do orçamento"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark do monitoramento simultâneo de vários pacientes (monitoring.scheduler).
+
+Simula, em tempo real, N fluxos de EEG chegando em pedaços de 0.5 s (com fases
+defasadas entre pacientes) e mede a latência por janela (do instante em que a
+janela ficou completa até a probabilidade sair do modelo). O modelo roda em
+ticks de cadência fixa (--tick-s, padrão: um passo de janela): cada tick junta
+em UM lote as janelas de todos os fluxos que ficaram prontas desde o anterior.
+Para cada N reporta p50/p95/máx, o tamanho médio dos lotes, o pior fluxo, a
+ocupação da CPU e as janelas descartadas, e ao final quantos fluxos cabem no
+orçamento de latência. Acima da capacidade, mostra como o sistema degrada.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.monitoring_benchmark
+    python -m benchmarks.monitoring_benchmark --streams 8 32 64 128 --budget-ms 250 --max-lag-s 2
+    python -m benchmarks.monitoring_benchmark --tick-s 0.25
+    python -m benchmarks.monitoring_benchmark --edf arquivo.edf --duration 30
+"""
+import argparse
+import heapq
+import time
+
+import numpy as np
+
+from monitoring.scheduler import MonitoringScheduler, TARGET_SFREQ, STEP_S
+
+
+def load_source(edf, seconds, n_channels=23):
+    if edf:
+        from predict import load_and_preprocess
+        return load_and_preprocess(edf).get_data()
+    # Ruído com escala de EEG (volts) quando não há EDF
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((n_channels, int(seconds * TARGET_SFREQ))) * 20e-6
+
+
+def run(n_streams, source, predict, scaler, duration, max_batch, max_lag_s, tick_s=STEP_S, features="wavelet"):
+    sched = MonitoringScheduler(predict, scaler, max_batch=max_batch, max_lag_s=max_lag_s, features=features)
+    chunk = int(STEP_S * TARGET_SFREQ)
+    n_src = source.shape[1]
+    cursor = {}
+    t_start = time.perf_counter() + 0.1
+
+    # Fila de chegadas (instante, fluxo); fases espalhadas dentro de um passo
+    arrivals = []
+    for k in range(n_streams):
+        sched.add_stream(k, source.shape[0])
+        cursor[k] = (k * 7919 * chunk) % max(n_src - chunk, 1)
+        heapq.heappush(arrivals, (t_start + STEP_S * k / n_streams, k))
+
+    # Aquecimento do modelo fora da medição
+    predict(sched.extract_features(np.zeros((1, source.shape[0], sched.window)), sched.sfreq).astype(np.float32))
+
+    t_end = t_start + duration
+    next_tick = t_start + tick_s
+    busy = 0.0
+    while True:
+        now = time.perf_counter()
+        if now >= t_end:
+            break
+        t0 = now
+        while arrivals and arrivals[0][0] <= now:
+            t_arr, k = heapq.heappop(arrivals)
+            c = cursor[k]
+            sched.push(k, source[:, c:c + chunk], arrival_time=t_arr)
+            cursor[k] = (c + chunk) % (n_src - chunk)
+            heapq.heappush(arrivals, (t_arr + STEP_S, k))
+
+        # Cadência fixa: um lote com tudo o que ficou pronto no intervalo.
+        # O instante do tick é lido depois dos pushes (filtragem entra na latência)
+        if time.perf_counter() >= next_tick:
+            sched.tick()
+            # Atrasado (sobrecarga): o próximo tick sai logo em seguida
+            next_tick = max(next_tick + tick_s, time.perf_counter())
+        busy += time.perf_counter() - t0
+
+        wake = min(next_tick, arrivals[0][0] if arrivals else t_end, t_end)
+        time.sleep(max(0.0, wake - time.perf_counter()))
+
+    stats = sched.stats()
+    lat = np.concatenate([sched.streams[k].latencies for k in sched.streams if sched.streams[k].latencies] or [np.zeros(1)])
+    processed = sum(s["windows"] for s in stats.values())
+    dropped = sum(s["dropped"] for s in stats.values())
+    backlog = sched.pending_windows()
+    return {
+        "streams": n_streams,
+        "p50": float(np.percentile(lat, 50)),
+        "p95": float(np.percentile(lat, 95)),
+        "max": float(lat.max()),
+        "worst_p95": max(s["p95"] for s in stats.values()),
+        "batch": float(np.mean(sched.batch_sizes)) if sched.batch_sizes else 0.0,
+        "max_batch": max(sched.batch_sizes) if sched.batch_sizes else 0,
+        "busy": busy / duration,
+        "win_s": processed / duration,
+        "dropped": dropped / max(processed + dropped + backlog, 1),
+        "backlog": backlog,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do monitoramento de vários pacientes")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 4, 16, 32, 64, 128])
+    parser.add_argument("--duration", type=float, default=15.0, help="Segundos de tempo real por rodada")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="Orçamento de latência (p95)")
+    parser.add_argument("--max-batch", type=int, default=None, help="Limite de janelas por chamada do modelo")
+    parser.add_argument("--max-lag-s", type=float, default=None, help="Descarta janelas que esperaram na fila mais que isso")
+    parser.add_argument("--tick-s", type=float, default=STEP_S, help="Intervalo entre chamadas em lote do modelo")
+    parser.add_argument("--edf", type=str, default=None, help="EDF usado como fonte dos fluxos (padrão: ruído)")
+    parser.add_argument("--features", choices=["wavelet", "bandpower"], default="wavelet",
+                        help="Extrator de features (o mesmo do treino do modelo)")
+    parser.add_argument("--model", type=str, default=None, help="Padrão: artefato do train.py para --features")
+    parser.add_argument("--scaler", type=str, default=None)
+    parser.add_argument("--model-format", choices=["auto", "keras", "tflite"], default="auto")
+    args = parser.parse_args()
+
+    from models.runtime import artifact_paths, load_predictor, load_scaler
+    default_model, default_scaler, _ = artifact_paths("cnn_lstm", args.features)
+    args.model = args.model or default_model
+    args.scaler = args.scaler or default_scaler
+    predict, used = load_predictor(args.model, fmt=args.model_format)
+    scaler = load_scaler(args.scaler)
+    source = load_source(args.edf, seconds=120)
+    print(f"Modelo: {args.model} ({used}, features {args.features}) | {args.duration:.0f}s por rodada | tick a cada {args.tick_s:.2f}s | "
+          f"orçamento p95 {args.budget_ms:.0f} ms\n")
+
+    print(f"{'fluxos':>6} {'p50 ms':>8} {'p95 ms':>8} {'máx ms':>8} {'lote':>6} {'lote máx':>8} {'pior p95':>9} "
+          f"{'CPU':>5} {'jan/s':>7} {'descart.':>9} {'fila':>6}")
+    supported = 0
+    for n in args.streams:
+        r = run(n, source, predict, scaler, args.duration, args.max_batch, args.max_lag_s, args.tick_s, args.features)
+        ok = r["p95"] * 1000 <= args.budget_ms and r["dropped"] == 0
+        if ok:
+            supported = max(supported, n)
+        print(f"{n:>6} {r['p50']*1000:>8.1f} {r['p95']*1000:>8.1f} {r['max']*1000:>8.1f} {r['batch']:>6.1f} "
+              f"{r['max_batch']:>8} {r['worst_p95']*1000:>9.1f} {r['busy']*100:>4.0f}% {r['win_s']:>7.1f} {r['dropped']*100:>8.1f}% {r['backlog']:>6}"
+              f"{'' if ok else '  <- acima do orçamento'}")
+
+    print(f"\nFluxos suportados com p95 <= {args.budget_ms:.0f} ms e sem descartes: {supported}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark de inicialização do predict.py.
+
+Cada formato de modelo roda em um processo Python novo (imports frios) e mede
+separadamente: import das bibliotecas, carga de modelo+scaler e tempo até a
+primeira predição. Também mede o tempo de 'predict.py --help'.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.startup_benchmark
+    python -m benchmarks.startup_benchmark --edf caminho/arquivo.edf --repeat 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _child(fmt, model_path, scaler_path, edf_path):
+    t0 = time.perf_counter()
+    import numpy as np
+    import mne
+    from models.runtime import load_predictor, load_scaler, _tflite_interpreter_class
+    from processors.wavelet import extract_features_wavelet
+    from helpers.chbmit_helpers import make_windows
+    # Mesma cadeia de imports do load_predictor, para a carga medir só o modelo
+    if fmt == "keras":
+        import tensorflow  # noqa: F401
+    else:
+        _tflite_interpreter_class()
+    t_import = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    predict, used = load_predictor(model_path, fmt=fmt)
+    scaler = load_scaler(scaler_path)
+    t_load = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    if edf_path:
+        from predict import load_and_preprocess
+        raw = load_and_preprocess(edf_path)
+    else:
+        # Sinal sintético com o formato do CHB-MIT (23 canais, 256 Hz, 2 s)
+        info = mne.create_info(23, 256.0, ch_types="eeg")
+        raw = mne.io.RawArray(np.random.randn(23, 512) * 1e-5, info, verbose=False)
+    windows = make_windows(raw.n_times, raw.info["sfreq"])[:1]
+    X = extract_features_wavelet(raw, windows)
+    N, T, F = X.shape
+    X = scaler.transform(X.reshape(-1, F)).reshape(N, T, F)
+    predict(X)
+    t_first = time.perf_counter() - t0
+
+    print(json.dumps({"format": used, "import_s": t_import, "load_s": t_load, "first_pred_s": t_first}))
+
+
+def _run(cmd):
+    t0 = time.perf_counter()
+    res = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    return time.perf_counter() - t0, res
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do predict.py")
+    parser.add_argument("--edf", type=str, default=None, help="EDF real para a primeira predição (padrão: sinal sintético)")
+    parser.add_argument("--model", type=str, default="modelo_final_epilepsia.keras")
+    parser.add_argument("--scaler", type=str, default="scaler_treinado.pkl")
+    parser.add_argument("--formats", nargs="+", default=["keras", "tflite"], choices=["keras", "tflite"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.model, args.scaler, args.edf)
+        return
+
+    help_times = [_run([sys.executable, "predict.py", "--help"])[0] for _ in range(args.repeat)]
+    print(f"predict.py --help: {min(help_times)*1000:.0f} ms (melhor de {args.repeat})")
+
+    print(f"\n{'formato':<8} {'import (s)':>11} {'carga (s)':>10} {'1a pred (s)':>12} {'total (s)':>10}")
+    for fmt in args.formats:
+        tflite_path = os.path.join(ROOT, os.path.splitext(args.model)[0] + ".tflite")
+        if fmt == "tflite" and not os.path.exists(tflite_path):
+            print(f"{fmt:<8} ignorado: rode 'python predict.py --convert' antes")
+            continue
+        cmd = [sys.executable, "-m", "benchmarks.startup_benchmark", "--child", fmt,
+               "--model", args.model, "--scaler", args.scaler]
+        if args.edf:
+            cmd += ["--edf", args.edf]
+
+        runs = []
+        for _ in range(args.repeat):
+            _, res = _run(cmd)
+            if res.returncode != 0:
+                print(f"{fmt:<8} falhou: {res.stderr.strip().splitlines()[-1] if res.stderr.strip() else res.returncode}")
+                break
+            runs.append(json.loads(res.stdout.strip().splitlines()[-1]))
+        if not runs:
+            continue
+
+        # Mediana de cada etapa entre as repetições
+        med = {k: sorted(r[k] for r in runs)[len(runs) // 2] for k in ("import_s", "load_s", "first_pred_s")}
+        total = sum(med.values())
+        print(f"{fmt:<8} {med['import_s']:>11.2f} {med['load_s']:>10.2f} {med['first_pred_s']:>12.2f} {total:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
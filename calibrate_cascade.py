@@ -0,0 +1,68 @@
+import argparse
+import numpy as np
+
+from data_source import connect_data_source
+from helpers.chbmit_helpers import get_patient_folder_ids, batch_list_patient_edfs
+from readers.chbmit_reader import build_windows_and_labels
+from processors.screening import extract_screening_features, calibrate_screening, save_screening, DEFAULT_MARGIN
+from predict import SCREENING_PATH, WINDOW_S, STEP_S
+
+# ==============================================================================
+# Calibra os limiares da triagem da cascata (predict.py --cascade) num conjunto
+# rotulado: nenhuma janela de crise do conjunto pode ser descartada no 1º estágio.
+# A origem dos dados segue CHBMIT_BACKEND (Drive ou espelho local).
+# ==============================================================================
+def main():
+    parser = argparse.ArgumentParser(description='Calibração dos limiares da triagem (cascata)')
+    parser.add_argument('--patients', nargs='+', default=[f"chb{i:02d}" for i in range(1, 25)])
+    parser.add_argument('--normal-files', type=int, default=2, help='Arquivos sem crise por paciente')
+    parser.add_argument('--margin', type=float, default=DEFAULT_MARGIN, help='Fator sobre o mínimo das crises (<= 1)')
+    parser.add_argument('--out', type=str, default=SCREENING_PATH)
+    args = parser.parse_args()
+
+    service, root_id = connect_data_source()
+    patient_ids = get_patient_folder_ids(service, root_id, args.patients)
+    patient_edfs = batch_list_patient_edfs(service, patient_ids)
+
+    all_F = []
+    all_y = []
+    for patient in args.patients:
+        patient_id = patient_ids.get(patient)
+        if patient_id is None:
+            print(f"  [Skip] Paciente {patient} não encontrado na fonte de dados")
+            continue
+
+        edfs = patient_edfs[patient]
+        files = [f for f in edfs if f['has_seizures_file']] + [f for f in edfs if not f['has_seizures_file']][:args.normal_files]
+        for edf_row in files:
+            try:
+                raw, windows, y = build_windows_and_labels(
+                    service, root_id, patient, edf_row["name"],
+                    window_s=WINDOW_S, step_s=STEP_S,
+                    patient_id=patient_id, edf_row=edf_row
+                )
+            except Exception as e:
+                print(f"    [Skip] {edf_row['name']}: {e}")
+                continue
+            if len(windows) == 0:
+                continue
+            all_F.append(extract_screening_features(raw, windows))
+            all_y.append(y)
+            print(f"    [OK] {edf_row['name']}: {len(windows)} janelas ({int(y.sum())} de crise)")
+
+    if not all_F:
+        print("\n[ERRO] Nenhum dado foi coletado.")
+        return
+
+    params = calibrate_screening(np.concatenate(all_F), np.concatenate(all_y), margin=args.margin)
+    save_screening(params, args.out)
+
+    print(f"\n[CASCATA] Limiares salvos em '{args.out}'")
+    for name, thr in zip(params["features"], params["thresholds"]):
+        print(f"  {name}: {thr:.3f} (x mediana da gravação)")
+    print(f"  Janelas descartadas na triagem: {params['skipped_fraction']*100:.1f}% "
+          f"({params['skipped_normal_fraction']*100:.1f}% das normais, 0 de {params['n_seizure_windows']} de crise)")
+
+
+if __name__ == "__main__":
+    main()
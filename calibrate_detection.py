@@ -0,0 +1,185 @@
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from data_source import connect_data_source
+from helpers.chbmit_helpers import get_patient_folder_ids, batch_list_patient_edfs, get_intervals_from_drive, label_windows
+from helpers.event_calibration import evaluate_recording, aggregate, pareto_front
+from utils.drive_utils import (local_file_path, stream_file_to_path, drive_content_digest, download_path,
+                               remove_download)
+from utils.prob_cache import load_probabilities
+from models.runtime import artifact_paths
+from predict import (CACHE_DIR, FEATURES, THRESHOLD_CONFIDENCE, MIN_CONSECUTIVE_WINDOWS,
+                     MERGE_GAP_WINDOWS, STEP_S, get_probabilities, probabilities_cache_path)
+
+OUT_PATH = 'calibracao_deteccao.csv'
+
+
+# ==============================================================================
+# Calibra limiar x janelas consecutivas x fusão de eventos do predict.py em todo
+# o corpus rotulado. As probabilidades vêm do cache do predict.py (o modelo só
+# roda nas gravações ainda não vistas); a grade inteira é avaliada de forma
+# vetorizada por gravação, com as gravações distribuídas entre processos.
+# A origem dos dados segue CHBMIT_BACKEND (Drive ou espelho local). No Drive a
+# chave do cache usa o md5Checksum + tamanho dos metadados: só as gravações
+# sem probabilidades guardadas são baixadas.
+# ==============================================================================
+def load_corpus(args):
+    service, root_id = connect_data_source()
+    patient_ids = get_patient_folder_ids(service, root_id, args.patients)
+    patient_edfs = batch_list_patient_edfs(service, patient_ids)
+
+    corpus = []
+    for patient in args.patients:
+        patient_id = patient_ids.get(patient)
+        if patient_id is None:
+            print(f"  [Skip] Paciente {patient} não encontrado na fonte de dados")
+            continue
+
+        edfs = patient_edfs[patient]
+        normal = [f for f in edfs if not f['has_seizures_file']]
+        if args.normal_files is not None:
+            normal = normal[:args.normal_files]
+        for edf_row in [f for f in edfs if f['has_seizures_file']] + normal:
+            edf_path = local_file_path(service, edf_row["id"])
+            digest = None if edf_path is not None else drive_content_digest(service, edf_row["id"])
+            opts = dict(model_format=args.model_format, cache_dir=args.cache_dir, features=args.features)
+            try:
+                cached = None
+                if digest is not None:
+                    cache_path = probabilities_cache_path(None, args.model, args.scaler, edf_digest=digest, **opts)
+                    cached = load_probabilities(cache_path) if cache_path else None
+                if cached is not None:
+                    probs, windows, sfreq = cached["probs"], cached["windows"], cached["sfreq"]
+                else:
+                    # Sem entrada no cache: baixa para o caminho fixo do file id (retomável)
+                    downloaded = None
+                    if edf_path is None:
+                        edf_path = downloaded = download_path(edf_row["id"])
+                        stream_file_to_path(service, edf_row["id"], downloaded, verbose=True)
+                    probs, windows, sfreq, _ = get_probabilities(edf_path, args.model, args.scaler, verbose=0,
+                                                                 edf_digest=digest, **opts)
+                    if downloaded is not None:
+                        remove_download(downloaded)
+            except Exception as e:
+                print(f"    [Skip] {edf_row['name']}: {e}")
+                continue
+
+            intervals = get_intervals_from_drive(service, edf_row["name"], edf_row["seizures_id"], edf_row["summary_id"])
+            y = label_windows(windows, sfreq, intervals)
+            corpus.append((edf_row["name"], probs, y))
+    return corpus
+
+
+def _evaluate(item):
+    _, probs, y, thresholds, min_runs, gaps = item
+    return evaluate_recording(probs, y, thresholds, min_runs, gaps, step_s=STEP_S)
+
+
+# ==============================================================================
+# Entre configurações com métricas idênticas, fica a mais conservadora (maior
+# limiar, mais janelas consecutivas, menor gap), que tende a generalizar melhor
+# ==============================================================================
+def unique_by_metrics(idx, T, M, G, metrics):
+    idx = idx[np.lexsort((G[idx], -M[idx], -T[idx]))]
+    triples = np.stack([metrics['sensitivity'][idx], metrics['fa_per_hour'][idx],
+                        np.nan_to_num(metrics['latency_median_s'][idx], nan=np.inf)], axis=1)
+    _, first = np.unique(triples, axis=0, return_index=True)
+    return np.sort(idx[first])
+
+
+def save_csv(path, grid, metrics, pareto):
+    on_front = np.zeros(len(grid), dtype=bool)
+    on_front[pareto] = True
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(['limiar', 'min_janelas', 'gap', 'sensibilidade', 'falsos_alarmes_h',
+                    'latencia_mediana_s', 'latencia_max_s', 'pareto'])
+        for i, (t, m, g) in enumerate(grid):
+            w.writerow([f"{t:.3f}", m, g, f"{metrics['sensitivity'][i]:.4f}", f"{metrics['fa_per_hour'][i]:.4f}",
+                        f"{metrics['latency_median_s'][i]:.2f}", f"{metrics['latency_max_s'][i]:.2f}", int(on_front[i])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Calibração das regras de evento (limiar, janelas consecutivas, fusão)')
+    parser.add_argument('--patients', nargs='+', default=[f"chb{i:02d}" for i in range(1, 25)])
+    parser.add_argument('--normal-files', type=int, default=None, help='Limita os arquivos sem crise por paciente (padrão: todos)')
+    parser.add_argument('--features', choices=['wavelet', 'bandpower'], default=FEATURES)
+    parser.add_argument('--model', type=str, default=None, help='Padrão: artefato do train.py para --features')
+    parser.add_argument('--scaler', type=str, default=None)
+    parser.add_argument('--model-format', choices=['auto', 'keras', 'tflite'], default='auto')
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR)
+    parser.add_argument('--thresholds', type=float, nargs=3, default=[0.50, 0.99, 0.01], metavar=('INÍCIO', 'FIM', 'PASSO'))
+    parser.add_argument('--min-runs', type=int, nargs=2, default=[1, 40], metavar=('MIN', 'MÁX'))
+    parser.add_argument('--gaps', type=int, nargs='+', default=[0, 1, 2, 4, 8, 16, 32],
+                        help='Fusão de eventos separados por até N janelas')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Processos na avaliação da grade')
+    parser.add_argument('--top', type=int, default=25, help='Linhas da fronteira de Pareto exibidas')
+    parser.add_argument('--out', type=str, default=OUT_PATH)
+    args = parser.parse_args()
+    default_model, default_scaler, _ = artifact_paths('cnn_lstm', args.features)
+    args.model = args.model or default_model
+    args.scaler = args.scaler or default_scaler
+
+    t0 = time.perf_counter()
+    corpus = load_corpus(args)
+    if not corpus:
+        print("\n[ERRO] Nenhum dado foi coletado.")
+        return
+    t_load = time.perf_counter() - t0
+
+    thresholds = np.round(np.arange(args.thresholds[0], args.thresholds[1] + 1e-9, args.thresholds[2]), 4)
+    min_runs = np.arange(args.min_runs[0], args.min_runs[1] + 1)
+    gaps = np.asarray(sorted(set(args.gaps)))
+
+    t0 = time.perf_counter()
+    items = [(name, p, y, thresholds, min_runs, gaps) for name, p, y in corpus]
+    if args.workers and args.workers > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(_evaluate, items, chunksize=max(1, len(items) // (4 * args.workers))))
+    else:
+        results = [_evaluate(item) for item in items]
+    agg = aggregate(results)
+    t_grid = time.perf_counter() - t0
+
+    # Grade achatada na ordem (limiar, min_janelas, gap)
+    T, M, G = np.meshgrid(thresholds, min_runs, gaps, indexing='ij')
+    grid = list(zip(T.ravel(), M.ravel(), G.ravel()))
+    metrics = {k: agg[k].ravel() for k in ('sensitivity', 'fa_per_hour', 'latency_median_s', 'latency_max_s')}
+    pareto = pareto_front(metrics['sensitivity'], metrics['fa_per_hour'], metrics['latency_median_s'])
+    pareto = unique_by_metrics(pareto, T.ravel(), M.ravel(), G.ravel(), metrics)
+    save_csv(args.out, grid, metrics, pareto)
+
+    print(f"\n[CALIBRAÇÃO] {len(corpus)} gravações, {agg['hours']:.1f} h, {agg['n_seizures']} crises")
+    print(f"  Probabilidades (cache/modelo): {t_load:.2f}s | grade de {len(grid)} configurações: {t_grid:.2f}s")
+    print(f"  Resultados completos em '{args.out}'")
+
+    def row(i, mark=''):
+        t, m, g = grid[i]
+        return (f"{t:>7.2f} {m:>7} {g:>5} {metrics['sensitivity'][i]*100:>8.1f}% {metrics['fa_per_hour'][i]:>8.2f} "
+                f"{metrics['latency_median_s'][i]:>9.1f}{mark}")
+
+    header = f"{'limiar':>7} {'min jan':>7} {'gap':>5} {'sensib.':>9} {'FA/h':>8} {'latência':>9}"
+    order = pareto[np.lexsort((-metrics['sensitivity'][pareto], metrics['fa_per_hour'][pareto]))]
+    print(f"\nFronteira de Pareto ({len(pareto)} configurações; sensibilidade, FA/h e latência mediana em s):")
+    print(header)
+    for i in order[:args.top]:
+        print(row(i))
+    if len(order) > args.top:
+        print(f"  ... (+{len(order) - args.top} no CSV)")
+
+    # Configuração atual do predict.py, para referência
+    current = np.flatnonzero((np.isclose(T.ravel(), THRESHOLD_CONFIDENCE)) & (M.ravel() == MIN_CONSECUTIVE_WINDOWS)
+                             & (G.ravel() == MERGE_GAP_WINDOWS))
+    if len(current):
+        print("\nConfiguração atual do predict.py:")
+        print(header)
+        print(row(current[0], '  (na fronteira)' if current[0] in set(pareto) else ''))
+
+
+if __name__ == "__main__":
+    main()
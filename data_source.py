@@ -0,0 +1,29 @@
+import os
+
+# ==============================================================================
+# Configuração da origem dos dados do CHB-MIT.
+#   CHBMIT_BACKEND=drive  -> Google Drive (OAuth via drive_connection.auth_drive)
+#   CHBMIT_BACKEND=local  -> espelho em disco com a mesma organização da pasta
+#                            '1.0.0' do Drive (chb01/, chb02/, ...) em CHBMIT_LOCAL_ROOT
+# ==============================================================================
+DATA_BACKEND = os.environ.get("CHBMIT_BACKEND", "drive")
+LOCAL_ROOT = os.environ.get("CHBMIT_LOCAL_ROOT", "edfs")
+DRIVE_FOLDER_ID = "1nJm3E6XnYVVFz2itBBdC-qtSab6GZmLO" # ID da pasta '1.0.0' no Google Drive
+
+
+# ============================================================================
+# Retorna (service, root_folder_id) para o backend escolhido. O 'service' é
+# aceito por todos os helpers de utils.drive_utils, helpers e readers.
+# ============================================================================
+def connect_data_source(backend: str = None, local_root: str = None, drive_folder_id: str = DRIVE_FOLDER_ID):
+  backend = (backend or DATA_BACKEND).lower()
+
+  if backend == "local":
+    from utils.local_source import LocalSource, ROOT_ID
+    return LocalSource(local_root or LOCAL_ROOT), ROOT_ID
+
+  if backend == "drive":
+    from drive_connection import auth_drive
+    return auth_drive(), drive_folder_id
+
+  raise ValueError(f"Backend de dados desconhecido: {backend} (use 'drive' ou 'local')")
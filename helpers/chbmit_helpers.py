@@ -1,5 +1,5 @@
 from typing import Optional, List, Dict, Tuple
-from utils.drive_utils import list_children, find_by_name_in_folder, read_text_file
+from utils.drive_utils import list_children, batch_list_children, read_text_file
 import re
 import numpy as np
 
@@ -18,15 +18,44 @@ def get_patient_folder_id(service, root_folder_id: str, patient_name: str) -> Op
   return None
 
 
+# ============================================================================
+# Obtém os IDs das pastas de vários pacientes em uma única requisição em lote
+# ============================================================================
+def get_patient_folder_ids(service, root_folder_id: str, patient_names: List[str]) -> Dict[str, Optional[str]]:
+  queries = [(root_folder_id, f"name='{p}' and mimeType='{FOLDER_MIMETYPE}'") for p in patient_names]
+  results = batch_list_children(service, queries)
+  return {p: (children[0]["id"] if children else None) for p, children in zip(patient_names, results)}
+
+
 # =========================================================
 # Lista todos os arquivos .edf e seus arquivos de anotações
 # =========================================================
 def list_patient_edfs(service, patient_folder_id: str) -> List[Dict]:
-  items = list_children(service, patient_folder_id)
+  return _edf_rows(list_children(service, patient_folder_id))
+
+
+# ==============================================================================
+# Versão em lote de list_patient_edfs: { paciente: linhas } para as pastas dadas
+# por get_patient_folder_ids (pacientes sem pasta ficam de fora), em uma única
+# requisição em lote
+# ==============================================================================
+def batch_list_patient_edfs(service, patient_ids: Dict[str, Optional[str]]) -> Dict[str, List[Dict]]:
+  found = [(p, pid) for p, pid in patient_ids.items() if pid is not None]
+  listings = batch_list_children(service, [(pid, "") for _, pid in found])
+  return {p: _edf_rows(items) for (p, _), items in zip(found, listings)}
+
+
+# ==============================================================================
+# Uma linha por EDF da listagem da pasta do paciente, com os IDs do .seizures
+# do arquivo e do SUMMARY do paciente (None quando não existem)
+# ==============================================================================
+def _edf_rows(items: List[Dict]) -> List[Dict]:
   edfs = [it for it in items if it.get("name", "").endswith(".edf")]
   seizures = { (it["name"].replace(".seizures", "")): it["id"]
               for it in items if it.get("name", "").endswith(".edf.seizures") }
-  
+  summary = next((it["id"] for it in sorted(items, key=lambda it: it.get("name", ""))
+                  if "summary" in it.get("name", "").lower()), None)
+
   out = []
   for f in edfs:
     name = f["name"]
@@ -34,7 +63,8 @@ def list_patient_edfs(service, patient_folder_id: str) -> List[Dict]:
       "id": f["id"],
       "name": name,
       "has_seizures_file": name in seizures,
-      "seizures_id": seizures.get(name)
+      "seizures_id": seizures.get(name),
+      "summary_id": summary,
     })
   out.sort(key=lambda x: x["name"])
   return out
@@ -163,17 +193,29 @@ def parse_patient_summary_text(txt: str) -> Dict[str, List[Tuple[float,float]]]:
   return out
 
 
+# SUMMARY já lido e interpretado, por arquivo (um download por paciente)
+_SUMMARY_CACHE: Dict[Tuple[int, str], Dict[str, List[Tuple[float,float]]]] = {}
+
+
+def _summary_intervals(service, summary_id: str) -> Dict[str, List[Tuple[float,float]]]:
+  key = (id(service), summary_id)
+  if key not in _SUMMARY_CACHE:
+    _SUMMARY_CACHE[key] = parse_patient_summary_text(read_text_file(service, summary_id))
+  return _SUMMARY_CACHE[key]
+
+
 # =========================================================================
 # Preferência: <edf_name>.seizures; fallback: SUMMARY da pasta do paciente.
+# seizures_id e summary_id vêm de list_patient_edfs (None quando não existem)
 # =========================================================================
-def get_intervals_from_drive(service, patient_folder_id: str, edf_name: str) -> List[Tuple[float,float]]:
+def get_intervals_from_drive(service, edf_name: str, seizures_id: Optional[str] = None,
+                             summary_id: Optional[str] = None) -> List[Tuple[float,float]]:
   intervals: List[Tuple[float,float]] = []
 
   # 1) tentar .edf.seizures
-  seiz = find_by_name_in_folder(service, patient_folder_id, edf_name + ".seizures")
-  if seiz:
+  if seizures_id:
     try:
-      txt = read_text_file(service, seiz["id"])
+      txt = read_text_file(service, seizures_id)
       intervals = parse_edf_seizures_text(txt)
     except Exception as e:
       print(f"[WARN] erro ao ler {edf_name}.seizures: {e}")
@@ -183,11 +225,8 @@ def get_intervals_from_drive(service, patient_folder_id: str, edf_name: str) ->
     return intervals
 
   # 2) fallback: SUMMARY (ex.: chb01-summary.txt)
-  summaries = list_children(service, patient_folder_id, q_extra="name contains 'summary'")
-  if summaries:
-    txt = read_text_file(service, summaries[0]["id"])
-    mapping = parse_patient_summary_text(txt)
-    return mapping.get(edf_name, [])
+  if summary_id:
+    return _summary_intervals(service, summary_id).get(edf_name, [])
 
   return []
 
@@ -221,4 +260,42 @@ def label_windows(windows: np.ndarray, sfreq: float, intervals: List[Tuple[float
       if not (b_h <= s or a >= e):
         y[i] = 1
         break
-  return y
\ No newline at end of file
+  return y
+
+# ==================================================================
+# Agrupa janelas positivas consecutivas em eventos (início, fim)
+# ==================================================================
+def label_events(y: np.ndarray) -> List[Tuple[int,int]]:
+  y = np.asarray(y).astype(np.int8)
+  d = np.diff(np.concatenate([[0], y, [0]]))
+  starts = np.flatnonzero(d == 1)
+  ends = np.flatnonzero(d == -1) - 1
+  return list(zip(starts.tolist(), ends.tolist()))
+
+
+# ==========================================================================
+# Métricas por evento: crises detectadas, falsos alarmes/hora e latência
+# (detections no formato de detect_sustained_events do predict.py)
+# ==========================================================================
+def score_events(y: np.ndarray, detections: List[Tuple[int,int]], step_s: float = 0.5, min_consecutive: int = 1) -> Dict:
+  seizures = label_events(y)
+  hours = len(y) * step_s / 3600.0
+  detected = 0
+  latencies = []
+  for s, e in seizures:
+    hits = [a for a, b in detections if a <= e and b >= s]
+    if hits:
+      detected += 1
+      # O alarme sai quando a sequência completa min_consecutive janelas
+      alarm = min(hits) + min_consecutive - 1
+      latencies.append(max(alarm - s, 0) * step_s)
+  false_alarms = sum(1 for a, b in detections if not any(a <= e and b >= s for s, e in seizures))
+  return {
+    "n_seizures": len(seizures),
+    "detected": detected,
+    "sensitivity": detected / len(seizures) if seizures else float("nan"),
+    "false_alarms": false_alarms,
+    "hours": hours,
+    "fa_per_hour": false_alarms / hours if hours > 0 else float("nan"),
+    "latencies_s": latencies,
+  }
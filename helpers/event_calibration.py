@@ -0,0 +1,192 @@
+from typing import Dict, List, Sequence, Tuple
+import warnings
+import numpy as np
+
+# ==============================================================================
+# Calibração vetorizada das regras de evento do predict.py sobre um corpus:
+# limiar x mínimo de janelas consecutivas x fusão de eventos próximos.
+#
+# Regra avaliada (gap = 0 reproduz detect_sustained_events exatamente):
+#   1. janelas com prob > limiar formam sequências (run-length por diff);
+#   2. só sequências com >= min_run janelas viram detecção;
+#   3. detecções separadas por <= gap janelas são fundidas num único evento
+#      (cada quebra maior que o gap abre um novo evento).
+# O alarme de um evento sai na janela início + min_run - 1 (igual ao monitor).
+# ==============================================================================
+
+
+# =======================================================================
+# Sequências de 1 em cada linha de uma matriz booleana (K, N), achatadas
+# =======================================================================
+def _runs_2d(b: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+  K = b.shape[0]
+  padded = np.zeros((K, b.shape[1] + 2), dtype=np.int8)
+  padded[:, 1:-1] = b
+  d = np.diff(padded, axis=1)
+  # np.nonzero percorre linha a linha, então inícios e fins ficam pareados
+  row, starts = np.nonzero(d == 1)
+  _, ends = np.nonzero(d == -1)
+  return row, starts, ends - 1
+
+
+# ========================================================================
+# Funde detecções (já ordenadas por linha) separadas por <= gap janelas,
+# para vários 'gaps' de uma vez. Retorna (g, linha, início, fim) por evento
+# ========================================================================
+def _merge_events(row: np.ndarray, s: np.ndarray, e: np.ndarray, gaps: np.ndarray):
+  R = len(row)
+  if R == 0:
+    empty = np.zeros(0, dtype=int)
+    return empty, empty, empty, empty
+  # Distância até a detecção anterior (infinita na troca de linha)
+  dist = np.full(R, np.iinfo(np.int64).max, dtype=np.int64)
+  dist[1:] = np.where(row[1:] == row[:-1], s[1:] - e[:-1] - 1, dist[1:])
+  new_event = dist[None, :] > gaps[:, None]               # (G, R)
+  g_idx, first = np.nonzero(new_event)
+  # O evento termina antes do próximo início da mesma linha de 'gaps'
+  last = np.empty_like(first)
+  last[:-1] = first[1:] - 1
+  last[-1] = R - 1
+  last[:-1][g_idx[1:] != g_idx[:-1]] = R - 1
+  return g_idx, row[first], s[first], e[last]
+
+
+# =====================================================================================
+# Avalia toda a grade numa gravação: crises detectadas, falsos alarmes e latências
+# =====================================================================================
+def evaluate_recording(probs: np.ndarray, y: np.ndarray, thresholds: Sequence[float], min_runs: Sequence[int],
+                       gaps: Sequence[int], step_s: float = 0.5) -> Dict:
+  probs = np.asarray(probs, dtype=np.float32)
+  thresholds = np.asarray(thresholds, dtype=np.float32)
+  min_runs = np.asarray(min_runs, dtype=int)
+  gaps = np.asarray(gaps, dtype=np.int64)
+  K, M, G = len(thresholds), len(min_runs), len(gaps)
+
+  # Crises rotuladas (sequências de y = 1)
+  _, sz_s, sz_e = _runs_2d(np.asarray(y, dtype=bool)[None, :])
+  S = len(sz_s)
+
+  detected = np.zeros((K, M, G), dtype=np.int64)
+  false_alarms = np.zeros((K, M, G), dtype=np.int64)
+  latency = np.full((K, M, G, S), np.nan)
+
+  # Todas as sequências acima de todos os limiares numa passada
+  row, s, e = _runs_2d(probs[None, :] > thresholds[:, None])
+  length = e - s + 1
+
+  for mi, m in enumerate(min_runs):
+    keep = length >= m
+    g, r, es, ee = _merge_events(row[keep], s[keep], e[keep], gaps)
+    if len(g) == 0:
+      continue
+
+    # Sobreposição evento x crise (E, S); S é pequeno (poucas crises por arquivo)
+    hit = (es[:, None] <= sz_e[None, :]) & (ee[:, None] >= sz_s[None, :])
+    fa = ~hit.any(axis=1)
+    np.add.at(false_alarms[:, mi, :], (r[fa], g[fa]), 1)
+
+    if S:
+      # Latência: do início da crise ao 1º alarme que a toca (>= 0)
+      alarm = es + m - 1
+      lat = np.where(hit, np.maximum(alarm[:, None] - sz_s[None, :], 0) * step_s, np.inf)
+      best = np.full((K, G, S), np.inf)
+      ev, sz = np.nonzero(hit)
+      np.minimum.at(best, (r[ev], g[ev], sz), lat[ev, sz])
+      found = np.isfinite(best)
+      detected[:, mi, :] = found.sum(axis=2)
+      latency[:, mi, :, :] = np.where(found, best, np.nan)
+
+  return {
+    "n_seizures": S,
+    "hours": len(probs) * step_s / 3600.0,
+    "detected": detected,
+    "false_alarms": false_alarms,
+    "latency": latency,
+  }
+
+
+# ===================================================================
+# Soma as gravações: sensibilidade, falsos alarmes/h e latência (s)
+# ===================================================================
+def aggregate(results: List[Dict]) -> Dict:
+  n_seizures = sum(r["n_seizures"] for r in results)
+  hours = sum(r["hours"] for r in results)
+  detected = sum(r["detected"] for r in results)
+  false_alarms = sum(r["false_alarms"] for r in results)
+  lat = [r["latency"] for r in results if r["n_seizures"]]
+  if lat:
+    lat = np.concatenate(lat, axis=-1)
+    # Configurações que não detectam nada ficam com latência NaN
+    with warnings.catch_warnings():
+      warnings.simplefilter("ignore", RuntimeWarning)
+      median = np.nanmedian(lat, axis=-1)
+      worst = np.nanmax(lat, axis=-1)
+  else:
+    median = worst = np.full(detected.shape, np.nan)
+  return {
+    "n_seizures": n_seizures,
+    "hours": hours,
+    "detected": detected,
+    "false_alarms": false_alarms,
+    "sensitivity": detected / n_seizures if n_seizures else np.full(detected.shape, np.nan),
+    "fa_per_hour": false_alarms / hours if hours > 0 else np.full(detected.shape, np.nan),
+    "latency_median_s": median,
+    "latency_max_s": worst,
+  }
+
+
+# ================================================================================
+# Fronteira de Pareto: maior sensibilidade, menos falsos alarmes/h, menor latência
+# (configurações que nenhuma outra supera em todos os critérios ao mesmo tempo)
+# ================================================================================
+def pareto_front(sensitivity: np.ndarray, fa_per_hour: np.ndarray, latency: np.ndarray, chunk: int = 512) -> np.ndarray:
+  # Tudo como custo (menor é melhor); latência indefinida (nada detectado) é a pior
+  costs = np.stack([-sensitivity, fa_per_hour, np.where(np.isnan(latency), np.inf, latency)], axis=1)
+  n = len(costs)
+  dominated = np.zeros(n, dtype=bool)
+  for i in range(0, n, chunk):
+    c = costs[i:i + chunk]
+    le = (costs[None, :, :] <= c[:, None, :]).all(axis=2)
+    lt = (costs[None, :, :] < c[:, None, :]).any(axis=2)
+    dominated[i:i + chunk] = (le & lt).any(axis=1)
+  return np.flatnonzero(~dominated)
+
+
+if __name__ == "__main__":
+  # Conferência contra as regras de referência (laço simples, janela a janela):
+  # detect_sustained_events + merge_close_events do predict.py e score_events.
+  # Uso: python -m helpers.event_calibration
+  from predict import detect_sustained_events, merge_close_events
+  from helpers.chbmit_helpers import score_events
+
+  rng = np.random.default_rng(0)
+  thresholds = np.array([0.5, 0.7, 0.85, 0.95])
+  min_runs = np.array([1, 2, 3, 5, 8])
+  gaps = np.array([0, 1, 3, 10])
+  mismatches = 0
+  n_recordings = 300
+  for _ in range(n_recordings):
+    n = int(rng.integers(20, 400))
+    y = np.zeros(n, dtype=int)
+    for _ in range(int(rng.integers(0, 4))):
+      s = int(rng.integers(0, n))
+      y[s:s + int(rng.integers(1, 40))] = 1
+    # Probabilidades ruidosas, mais altas dentro das crises
+    probs = np.clip(rng.random(n) * 0.8 + 0.35 * y + 0.2 * rng.standard_normal(n), 0, 1).astype(np.float32)
+
+    fast = evaluate_recording(probs, y, thresholds, min_runs, gaps, step_s=0.5)
+    for ti, t in enumerate(thresholds):
+      for mi, m in enumerate(min_runs):
+        for gi, g in enumerate(gaps):
+          events = merge_close_events(detect_sustained_events((probs > t).astype(int), m), g)
+          ref = score_events(y, events, step_s=0.5, min_consecutive=m)
+          lat = fast["latency"][ti, mi, gi]
+          same = (fast["n_seizures"] == ref["n_seizures"]
+                  and fast["detected"][ti, mi, gi] == ref["detected"]
+                  and fast["false_alarms"][ti, mi, gi] == ref["false_alarms"]
+                  and sorted(lat[~np.isnan(lat)].tolist()) == sorted(ref["latencies_s"]))
+          mismatches += not same
+
+  total = n_recordings * len(thresholds) * len(min_runs) * len(gaps)
+  print(f"{total} configurações x gravação conferidas, {mismatches} divergências")
+  assert mismatches == 0
@@ -0,0 +1,226 @@
+import os
+import numpy as np
+
+# Formatos de carga rápida gerados a partir dos artefatos do train.py.
+# O .tflite dispensa a desserialização do Keras (e, com tflite_runtime, o próprio
+# TensorFlow) e o .npz do scaler dispensa importar o scikit-learn.
+TFLITE_SUFFIX = ".tflite"
+SCALER_NPZ_SUFFIX = ".npz"
+TFLITE_BATCH_SIZE = 512
+
+
+def artifact_paths(name="cnn_lstm", features="wavelet"):
+    """
+    Caminhos (modelo, scaler, gráfico) gerados pelo train.py para a arquitetura
+    e o extrator de features. O CNN-LSTM com Wavelet mantém os nomes originais.
+    """
+    suffix = "".join(f"_{part}" for part, default in ((name, "cnn_lstm"), (features, "wavelet")) if part != default)
+    return (f"modelo_final_epilepsia{suffix}.keras", f"scaler_treinado{suffix}.pkl", f"resultado_treino{suffix}.png")
+
+
+def fast_model_path(model_path):
+    """Caminho do modelo convertido (.tflite) ao lado do .keras original."""
+    return os.path.splitext(model_path)[0] + TFLITE_SUFFIX
+
+
+def fast_scaler_path(scaler_path):
+    """Caminho do scaler exportado (.npz) ao lado do .pkl original."""
+    return os.path.splitext(scaler_path)[0] + SCALER_NPZ_SUFFIX
+
+
+def _is_fresh(fast_path, source_path):
+    # O formato rápido só vale se existir e não for mais antigo que o original
+    if not os.path.exists(fast_path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    return os.path.getmtime(fast_path) >= os.path.getmtime(source_path)
+
+
+def _unrolled_clone(model):
+    # O laço do LSTM (while + TensorList) não converte com lote dinâmico. Como a
+    # sequência é curta (~37 passos após o pooling), a cópia desenrolada com os
+    # mesmos pesos vira só multiplicações de matrizes e aceita qualquer lote.
+    config = model.get_config()
+    recurrent = False
+    for layer in config.get("layers", []):
+        if layer.get("class_name") in ("LSTM", "GRU", "SimpleRNN"):
+            layer["config"]["unroll"] = True
+            recurrent = True
+    if not recurrent:
+        return model
+    clone = model.__class__.from_config(config)
+    clone.set_weights(model.get_weights())
+    return clone
+
+
+def convert_model_to_tflite(model_path, out_path=None):
+    """
+    Converte o modelo Keras treinado para TFLite (carga e inferência rápidas em CPU).
+
+    Args:
+        model_path: Caminho do .keras salvo pelo train.py.
+        out_path: Destino do .tflite (padrão: mesmo nome com extensão .tflite).
+
+    Returns:
+        Caminho do arquivo gerado.
+    """
+    import tensorflow as tf
+
+    out_path = out_path or fast_model_path(model_path)
+    model = _unrolled_clone(tf.keras.models.load_model(model_path, compile=False))
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    tflite_model = converter.convert()
+    with open(out_path, "wb") as f:
+        f.write(tflite_model)
+    return out_path
+
+
+def export_scaler_npz(scaler_path, out_path=None):
+    """
+    Exporta os parâmetros do RobustScaler (center_ e scale_) para um .npz.
+
+    Args:
+        scaler_path: Caminho do .pkl salvo pelo train.py.
+        out_path: Destino do .npz (padrão: mesmo nome com extensão .npz).
+
+    Returns:
+        Caminho do arquivo gerado.
+    """
+    import joblib
+
+    out_path = out_path or fast_scaler_path(scaler_path)
+    scaler = joblib.load(scaler_path)
+    center = getattr(scaler, "center_", None)
+    scale = getattr(scaler, "scale_", None)
+    # Vetores vazios representam with_centering/with_scaling = False
+    np.savez(
+        out_path,
+        center=np.asarray(center if center is not None else [], dtype=np.float64),
+        scale=np.asarray(scale if scale is not None else [], dtype=np.float64),
+    )
+    return out_path
+
+
+class NpzScaler:
+    """Equivalente ao RobustScaler.transform a partir dos parâmetros em .npz."""
+
+    def __init__(self, path):
+        params = np.load(path)
+        self.center_ = params["center"] if params["center"].size else None
+        self.scale_ = params["scale"] if params["scale"].size else None
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64, copy=True)
+        if self.center_ is not None:
+            X -= self.center_
+        if self.scale_ is not None:
+            X /= self.scale_
+        return X
+
+
+def resolve_scaler_file(scaler_path, fmt="auto"):
+    """Arquivo que load_scaler vai usar (.npz ou .pkl), sem carregá-lo."""
+    npz_path = fast_scaler_path(scaler_path)
+    if fmt == "npz" or (fmt == "auto" and _is_fresh(npz_path, scaler_path)):
+        return npz_path
+    return scaler_path
+
+
+def load_scaler(scaler_path, fmt="auto"):
+    """
+    Carrega o scaler, preferindo o .npz quando disponível e atualizado.
+
+    Args:
+        scaler_path: Caminho do .pkl original.
+        fmt: 'auto', 'pkl' ou 'npz'.
+    """
+    path = resolve_scaler_file(scaler_path, fmt)
+    if path.endswith(SCALER_NPZ_SUFFIX):
+        return NpzScaler(path)
+
+    import joblib
+    return joblib.load(path)
+
+
+def _tflite_interpreter_class():
+    # Prefere os runtimes leves (LiteRT / tflite_runtime) ao TensorFlow completo
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def _tflite_interpreter(path):
+    return _tflite_interpreter_class()(model_path=path)
+
+
+def _tflite_predictor(path, batch_size=TFLITE_BATCH_SIZE):
+    interpreter = _tflite_interpreter(path)
+    inp = interpreter.get_input_details()[0]
+    out = interpreter.get_output_details()[0]
+    state = {"batch": None}
+
+    def predict(X, verbose=0):
+        X = np.asarray(X, dtype=inp["dtype"])
+        probs = []
+        for i in range(0, len(X), batch_size):
+            chunk = X[i:i + batch_size]
+            # Só realoca os tensores quando o tamanho do lote muda
+            if state["batch"] != len(chunk):
+                interpreter.resize_tensor_input(inp["index"], chunk.shape)
+                interpreter.allocate_tensors()
+                state["batch"] = len(chunk)
+            interpreter.set_tensor(inp["index"], chunk)
+            interpreter.invoke()
+            probs.append(interpreter.get_tensor(out["index"]).copy())
+        if not probs:
+            return np.zeros((0, 1), dtype=np.float32)
+        return np.concatenate(probs, axis=0)
+
+    return predict
+
+
+def _keras_predictor(path):
+    import tensorflow as tf
+    model = tf.keras.models.load_model(path, compile=False)
+
+    def predict(X, verbose=0):
+        return model.predict(X, verbose=verbose)
+
+    return predict
+
+
+def resolve_model_file(model_path, fmt="auto"):
+    """
+    Arquivo e formato que load_predictor vai usar, sem carregar o modelo.
+
+    Returns:
+        Tupla (caminho, formato_usado).
+    """
+    tflite_path = fast_model_path(model_path)
+    if fmt == "tflite" or (fmt == "auto" and _is_fresh(tflite_path, model_path)):
+        return tflite_path, "tflite"
+    return model_path, "keras"
+
+
+def load_predictor(model_path, fmt="auto"):
+    """
+    Carrega o modelo e devolve uma função predict(X, verbose=0) -> probs (N, 1).
+
+    Args:
+        model_path: Caminho do .keras original.
+        fmt: 'auto' (usa o .tflite se existir e estiver atualizado), 'keras' ou 'tflite'.
+
+    Returns:
+        Tupla (predict, formato_usado).
+    """
+    path, used = resolve_model_file(model_path, fmt)
+    if used == "tflite":
+        return _tflite_predictor(path), "tflite"
+    return _keras_predictor(path), "keras"
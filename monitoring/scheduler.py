@@ -0,0 +1,232 @@
+import time
+from collections import deque
+
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+from processors.features import get_batch_feature_extractor
+
+TARGET_SFREQ = 256.0
+WINDOW_S = 2.0
+STEP_S = 0.5
+THRESHOLD_CONFIDENCE = 0.85
+MIN_CONSECUTIVE_WINDOWS = 15
+
+
+class EventDetector:
+    """
+    Versão incremental do filtro de janelas consecutivas do predict.py.
+
+    O alarme sai no instante em que a sequência atinge min_consecutive janelas
+    (não no fim do evento); os eventos fechados ficam em 'events' como
+    (janela_inicial, janela_final), iguais aos de detect_sustained_events.
+    """
+
+    def __init__(self, threshold=THRESHOLD_CONFIDENCE, min_consecutive=MIN_CONSECUTIVE_WINDOWS):
+        self.threshold = threshold
+        self.min_consecutive = min_consecutive
+        self.streak = 0
+        self.start_idx = -1
+        self.end_idx = -1
+        self.last_idx = -1
+        self.events = []
+
+    def update(self, win_idx, prob):
+        """Processa uma janela; retorna True quando um alarme é disparado."""
+        # Janela descartada (sobrecarga) quebra a sequência
+        if win_idx != self.last_idx + 1:
+            self._close()
+        self.last_idx = win_idx
+
+        if prob > self.threshold:
+            if self.streak == 0:
+                self.start_idx = win_idx
+            self.streak += 1
+            self.end_idx = win_idx
+            return self.streak == self.min_consecutive
+        self._close()
+        return False
+
+    def _close(self):
+        if self.streak >= self.min_consecutive:
+            self.events.append((self.start_idx, self.end_idx))
+        self.streak = 0
+        self.start_idx = -1
+
+    def flush(self):
+        """Fecha o evento em andamento (fim do fluxo)."""
+        self._close()
+
+
+class StreamState:
+    """Estado de um paciente: filtro causal, buffer de amostras, janelas prontas e detector."""
+
+    def __init__(self, stream_id, n_channels, sos, window, step, threshold, min_consecutive):
+        self.stream_id = stream_id
+        self.n_channels = n_channels
+        self.window = window
+        self.step = step
+        self.sos = sos
+        # Estado do filtro por canal (n_seções, n_canais, 2), iniciado na 1ª amostra
+        self.zi = None
+        self.buffer = np.zeros((n_channels, 0))
+        self.buffer_start = 0        # índice absoluto da 1ª amostra do buffer
+        self.next_start = 0          # início absoluto da próxima janela
+        self.next_win_idx = 0
+        self.pending = deque()       # (win_idx, segmento (C, W), instante em que ficou pronta)
+        self.detector = EventDetector(threshold, min_consecutive)
+        self.latencies = []
+        self.alarms = []
+        self.dropped = 0
+
+    def push(self, samples, arrival_time):
+        samples = np.asarray(samples, dtype=np.float64)
+        if self.zi is None:
+            self.zi = sosfilt_zi(self.sos)[:, None, :] * samples[None, :, :1]
+        filtered, self.zi = sosfilt(self.sos, samples, axis=-1, zi=self.zi)
+        self.buffer = np.concatenate([self.buffer, filtered], axis=1)
+
+        end_abs = self.buffer_start + self.buffer.shape[1]
+        while self.next_start + self.window <= end_abs:
+            a = self.next_start - self.buffer_start
+            self.pending.append((self.next_win_idx, self.buffer[:, a:a + self.window].copy(), arrival_time))
+            self.next_start += self.step
+            self.next_win_idx += 1
+
+        # Só guarda o necessário para a próxima janela
+        keep_from = self.next_start - self.buffer_start
+        if keep_from > 0:
+            self.buffer = self.buffer[:, keep_from:]
+            self.buffer_start += keep_from
+
+
+class MonitoringScheduler:
+    """
+    Acompanha vários fluxos de EEG em um único processo.
+
+    Cada fluxo mantém seu próprio estado (filtro passa-banda causal, buffer,
+    detector de eventos). A cada tick, as janelas prontas de todos os fluxos são
+    reunidas em UMA chamada em lote do extrator de features + scaler + modelo, e
+    as probabilidades voltam para o detector de cada fluxo. 'features' escolhe o
+    extrator (processors.features) e precisa ser o mesmo do treino do modelo.
+
+    Sob sobrecarga, 'max_batch' limita o lote por tick (atendendo os fluxos em
+    rodízio, a janela mais antiga primeiro) e 'max_lag_s' descarta janelas que já
+    esperaram demais, para que a latência das demais não cresça sem limite.
+
+    Nota: o filtro do treino é FIR de fase zero (não causal); aqui é um
+    Butterworth causal de mesma banda, então as probabilidades podem diferir um
+    pouco das do predict.py offline.
+    """
+
+    def __init__(self, predict, scaler, sfreq=TARGET_SFREQ, window_s=WINDOW_S, step_s=STEP_S,
+                 threshold=THRESHOLD_CONFIDENCE, min_consecutive=MIN_CONSECUTIVE_WINDOWS,
+                 l_freq=0.5, h_freq=45.0, max_batch=None, max_lag_s=None, on_alarm=None, features='wavelet'):
+        self.predict = predict
+        self.scaler = scaler
+        self.features = features
+        self.extract_features = get_batch_feature_extractor(features)
+        self.sfreq = sfreq
+        self.window = int(round(window_s * sfreq))
+        self.step = int(round(step_s * sfreq))
+        self.threshold = threshold
+        self.min_consecutive = min_consecutive
+        self.sos = butter(4, [l_freq, h_freq], btype="band", fs=sfreq, output="sos")
+        self.max_batch = max_batch
+        self.max_lag_s = max_lag_s
+        self.on_alarm = on_alarm
+        self.streams = {}
+        self.batch_sizes = []
+        self.tick_times = []
+
+    def add_stream(self, stream_id, n_channels, sfreq=TARGET_SFREQ):
+        if sfreq != self.sfreq:
+            raise ValueError(f"Fluxo {stream_id} a {sfreq} Hz; o monitor espera {self.sfreq} Hz")
+        self.streams[stream_id] = StreamState(stream_id, n_channels, self.sos, self.window, self.step,
+                                              self.threshold, self.min_consecutive)
+        return self.streams[stream_id]
+
+    def remove_stream(self, stream_id):
+        state = self.streams.pop(stream_id)
+        state.detector.flush()
+        return state
+
+    def push(self, stream_id, samples, arrival_time=None):
+        """Entrega amostras novas (n_canais, n_amostras) de um fluxo."""
+        self.streams[stream_id].push(samples, time.perf_counter() if arrival_time is None else arrival_time)
+
+    def pending_windows(self):
+        return sum(len(s.pending) for s in self.streams.values())
+
+    def _gather(self, now):
+        # Descarta janelas velhas demais (degradação controlada sob sobrecarga)
+        if self.max_lag_s is not None:
+            for s in self.streams.values():
+                while s.pending and now - s.pending[0][2] > self.max_lag_s:
+                    s.pending.popleft()
+                    s.dropped += 1
+
+        # Rodízio entre fluxos, a janela mais antiga de cada um primeiro
+        batch = []
+        limit = self.max_batch or float("inf")
+        queues = [s for s in self.streams.values() if s.pending]
+        while queues and len(batch) < limit:
+            nxt = []
+            for s in queues:
+                if len(batch) >= limit:
+                    break
+                win_idx, segment, ready = s.pending.popleft()
+                batch.append((s, win_idx, segment, ready))
+                if s.pending:
+                    nxt.append(s)
+            queues = nxt
+        return batch
+
+    def tick(self, now=None):
+        """
+        Processa as janelas prontas de todos os fluxos em uma chamada do modelo.
+
+        Returns:
+            Lista de alarmes (stream_id, janela, instante em segundos no fluxo).
+        """
+        now = time.perf_counter() if now is None else now
+        batch = self._gather(now)
+        if not batch:
+            return []
+
+        t0 = time.perf_counter()
+        segments = np.stack([b[2] for b in batch])
+        X = self.extract_features(segments, self.sfreq)
+        N, T, F = X.shape
+        X = self.scaler.transform(X.reshape(-1, F)).reshape(N, T, F)
+        probs = np.asarray(self.predict(X, verbose=0)).flatten()
+        done = time.perf_counter()
+        self.batch_sizes.append(N)
+        self.tick_times.append(done - t0)
+
+        # Latência no relógio real, de quando a janela ficou pronta até a saída
+        # do modelo (inclui filtragem/buffer dos pushes e a espera pelo tick)
+        alarms = []
+        for (s, win_idx, _, ready), p in zip(batch, probs):
+            s.latencies.append(done - ready)
+            if s.detector.update(win_idx, p):
+                alarm = (s.stream_id, win_idx, win_idx * self.step / self.sfreq)
+                s.alarms.append(alarm)
+                alarms.append(alarm)
+                if self.on_alarm is not None:
+                    self.on_alarm(*alarm)
+        return alarms
+
+    def stats(self):
+        """Latência por fluxo (p50/p95/máx, em segundos) e janelas descartadas."""
+        out = {}
+        for sid, s in self.streams.items():
+            lat = np.asarray(s.latencies) if s.latencies else np.zeros(1)
+            out[sid] = {
+                "windows": len(s.latencies),
+                "dropped": s.dropped,
+                "p50": float(np.percentile(lat, 50)),
+                "p95": float(np.percentile(lat, 95)),
+                "max": float(lat.max()),
+            }
+        return out
@@ -1,82 +1,60 @@
-import mne
-import numpy as np
-import tensorflow as tf
-import joblib
 import argparse
 import os
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
 
-# Importa as mesmas funções usadas no treino para garantir consistência
-from processors.wavelet import extract_features_wavelet
-from helpers.chbmit_helpers import make_windows
+# Imports pesados (TensorFlow, MNE, matplotlib, scikit-learn) são feitos dentro das
+# funções que os usam: assim '--help' e as saídas de erro respondem na hora.
 
-def predict_pipeline(edf_path, model_path='modelo_final_epilepsia.keras', scaler_path='scaler_treinado.pkl'):
-    # 1. Validação de Arquivos
-    if not os.path.exists(model_path) or not os.path.exists(scaler_path):
-        print("ERRO CRÍTICO: Você precisa treinar o modelo primeiro (rode train.py).")
-        print("Certifique-se de que 'modelo_final_epilepsia.keras' e 'scaler_treinado.pkl' existem.")
-        return
+MODEL_PATH = 'modelo_final_epilepsia.keras'
+SCALER_PATH = 'scaler_treinado.pkl'
+PLOT_PATH = 'predicao_epilepsia.png'
+SCREENING_PATH = 'screening_thresholds.json'
+CACHE_DIR = os.environ.get('SEIZURE_CACHE_DIR', '.cache_probabilidades')
 
-    print(f"--- Carregando Artefatos ---")
-    model = tf.keras.models.load_model(model_path)
-    scaler = joblib.load(scaler_path)
-    print("Modelo e Scaler carregados.")
+THRESHOLD_CONFIDENCE = 0.85
+MIN_CONSECUTIVE_WINDOWS = 15  # ~7 a 8 segundos contínuos
+MERGE_GAP_WINDOWS = 0  # funde eventos separados por até N janelas (0 = desligado)
+WINDOW_S = 2.0
+STEP_S = 0.5
+L_FREQ = 0.5
+H_FREQ = 45.0
+TARGET_SFREQ = 256
+FEATURES = 'wavelet'  # extrator de features (ver processors/features.py)
+
+
+# ====================================================================
+# Lê o EDF e aplica o mesmo pré-processamento do treino (chbmit_reader)
+# ====================================================================
+def load_and_preprocess(edf_path):
+    import mne
 
-    # 2. Leitura e Pré-processamento do EDF (Igual ao chbmit_reader.py)
     print(f"--- Lendo {edf_path} ---")
     # Carrega em memória
     raw = mne.io.read_raw_edf(edf_path, preload=True, verbose=False)
-    
+
     # Filtro de Banda (0.5 - 45 Hz) - Essencial para remover ruído DC e alta frequência
-    raw.filter(l_freq=0.5, h_freq=45.0, fir_design="firwin", verbose=False)
-    
+    raw.filter(l_freq=L_FREQ, h_freq=H_FREQ, fir_design="firwin", verbose=False)
+
     # Resample para 256 Hz (A rede espera essa densidade de dados)
-    if raw.info['sfreq'] != 256:
-        print(f"Reamostrando de {raw.info['sfreq']} Hz para 256 Hz...")
-        raw.resample(256, npad="auto")
+    if raw.info['sfreq'] != TARGET_SFREQ:
+        print(f"Reamostrando de {raw.info['sfreq']} Hz para {TARGET_SFREQ} Hz...")
+        raw.resample(TARGET_SFREQ, npad="auto")
 
     # Seleciona apenas canais EEG (remove ECG, etc se houver mix)
-    # Nota: Se os canais forem diferentes do treino, a Wavelet vai quebrar. 
+    # Nota: Se os canais forem diferentes do treino, a Wavelet vai quebrar.
     # Assumindo consistência do CHB-MIT.
     if 'eeg' in raw:
         raw.pick_types(eeg=True)
+    return raw
 
-    # 3. Janelamento (2s janela, 0.5s passo)
-    sf = raw.info['sfreq']
-    windows = make_windows(raw.n_times, sf, window_s=2.0, step_s=0.5)
-    print(f"Geradas {len(windows)} janelas de análise.")
-
-    # 4. Feature Extraction (Wavelet db4)
-    # Isso transforma o sinal bruto em tensores que a rede entende
-    X = extract_features_wavelet(raw, windows, wavelet='db4', level=4)
-    
-    # 5. Normalização (CRUCIAL)
-    # Achatamos para 2D -> aplicamos a régua do treino -> voltamos para 3D
-    N, T, F = X.shape
-    X_flat = X.reshape(-1, F)
-    X_scaled = scaler.transform(X_flat).reshape(N, T, F)
-
-    # 6. Inferência (Predição)
-    print("--- Analisando Atividade Cerebral ---")
-    # verbose=1 mostra barra de progresso
-    probs = model.predict(X_scaled, verbose=1)
-    
-    # Limiar de decisão (padrão 0.5, mas ajustável)
-    #threshold = 0.5
-    THRESHOLD_CONFIDENCE = 0.85
-    #predictions = (probs > threshold).astype(int)
-    raw_predictions = (probs > THRESHOLD_CONFIDENCE).astype(int).flatten()
-
-
-    MIN_CONSECUTIVE_WINDOWS = 15  # ~7 a 8 segundos contínuos
-    print(f">> Aplicando filtro: Mínimo de {MIN_CONSECUTIVE_WINDOWS} janelas consecutivas com confiança > {THRESHOLD_CONFIDENCE*100}%")
 
+# ===============================================================
+# Mantém apenas sequências de pelo menos min_consecutive janelas 1
+# ===============================================================
+def detect_sustained_events(raw_predictions, min_consecutive=MIN_CONSECUTIVE_WINDOWS):
     final_detections = []
     current_streak = 0
     start_idx = -1
-    
+
     for i, pred in enumerate(raw_predictions):
         if pred == 1:
             if current_streak == 0:
@@ -84,52 +62,313 @@ def predict_pipeline(edf_path, model_path='modelo_final_epilepsia.keras', scaler
             current_streak += 1
         else:
             # Se a sequência quebrou, verificamos se ela foi longa o suficiente
-            if current_streak >= MIN_CONSECUTIVE_WINDOWS:
+            if current_streak >= min_consecutive:
                 final_detections.append((start_idx, i - 1))
             current_streak = 0
             start_idx = -1
-            
+
     # Caso a crise vá até o final do arquivo
-    if current_streak >= MIN_CONSECUTIVE_WINDOWS:
-         final_detections.append((start_idx, len(raw_predictions) - 1))
+    if current_streak >= min_consecutive:
+        final_detections.append((start_idx, len(raw_predictions) - 1))
+    return final_detections
 
-    # 7. Relatório Final Filtrado
+
+# ===========================================================
+# Funde eventos separados por no máximo max_gap janelas
+# ===========================================================
+def merge_close_events(final_detections, max_gap=MERGE_GAP_WINDOWS):
+    merged = []
+    for start_idx, end_idx in final_detections:
+        if merged and start_idx - merged[-1][1] - 1 <= max_gap:
+            merged[-1] = (merged[-1][0], end_idx)
+        else:
+            merged.append((start_idx, end_idx))
+    return merged
+
+
+def report_events(final_detections, raw_predictions):
     if len(final_detections) == 0:
         print("\n>>> RESULTADO FINAL: Normal (Nenhuma crise sustentada detectada).")
-        print(f"    (Nota: O modelo pode ter visto {np.sum(raw_predictions)} janelas suspeitas isoladas, mas foram descartadas como ruído).")
-    else:
-        print(f"\n>>> ALERTA CONFIRMADO: Detectados {len(final_detections)} eventos epilépticos sustentados.")
-        
-        for start_win, end_win in final_detections:
-            # Converter índice de janela para segundos
-            # Janela = 2s, Step = 0.5s.
-            # Tempo = indice * 0.5
-            t_start = start_win * 0.5
-            t_end = (end_win * 0.5) + 2.0 # +2.0 pela duração da última janela
-            duration = t_end - t_start
-            
-            print(f"  [EVENTO] {t_start:.2f}s até {t_end:.2f}s (Duração: {duration:.2f}s)")
+        print(f"    (Nota: O modelo pode ter visto {int(raw_predictions.sum())} janelas suspeitas isoladas, mas foram descartadas como ruído).")
+        return
+
+    print(f"\n>>> ALERTA CONFIRMADO: Detectados {len(final_detections)} eventos epilépticos sustentados.")
+    for start_win, end_win in final_detections:
+        # Converter índice de janela para segundos
+        # Tempo = indice * passo (+ duração da última janela no fim)
+        t_start = start_win * STEP_S
+        t_end = (end_win * STEP_S) + WINDOW_S
+        duration = t_end - t_start
+
+        print(f"  [EVENTO] {t_start:.2f}s até {t_end:.2f}s (Duração: {duration:.2f}s)")
+
+
+def plot_predictions(probs, raw_predictions, final_detections, threshold, out_path=PLOT_PATH):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(18, 5))
     plt.plot(probs.flatten(), label="Probabilidade de Crise", color='blue')
     plt.plot(raw_predictions * 1.05, label="Predição Binária (> limiar)", color='red', alpha=0.5)
-    
+
     for (start_win, end_win) in final_detections:
         plt.axvspan(start_win, end_win, color='orange', alpha=0.3, label='Crise Detectada' if start_win == final_detections[0][0] else None)
 
-    plt.axhline(THRESHOLD_CONFIDENCE, color='green', linestyle='--', label=f"Limiar = {THRESHOLD_CONFIDENCE}")
+    plt.axhline(threshold, color='green', linestyle='--', label=f"Limiar = {threshold}")
     plt.title("Probabilidade de Crise por Janela")
-    plt.xlabel("Janela (cada passo = 0.5s)")
+    plt.xlabel(f"Janela (cada passo = {STEP_S}s)")
     plt.ylabel("Probabilidade")
     plt.legend(loc='upper right')
     plt.grid(alpha=0.3)
 
-    plt.savefig("predicao_epilepsia.png")
+    plt.savefig(out_path)
+    plt.close()
+    print(f"[INFO] Gráfico salvo como '{out_path}'")
+
+
+# ==============================================================================
+# Probabilidade de crise por janela. Com 'screening' (limiares calibrados), as
+# janelas claramente normais param no 1º estágio com probabilidade 0 e só as
+# demais passam pela Wavelet e pelo modelo.
+# ==============================================================================
+def compute_probabilities(raw, windows, predict, scaler, screening=None, verbose=1, features=FEATURES):
+    import time
+    import numpy as np
+    from processors.features import get_feature_extractor
+
+    info = {"n_windows": len(windows), "skipped_fraction": 0.0, "screening_s": 0.0}
+    keep = np.ones(len(windows), dtype=bool)
+
+    t0 = time.perf_counter()
+    if screening is not None:
+        from processors.screening import extract_screening_features, screen_windows
+        F = extract_screening_features(raw, windows, relative=screening.get("relative", True))
+        keep = screen_windows(F, screening["thresholds"])
+        info["skipped_fraction"] = float(1.0 - keep.mean()) if len(keep) else 0.0
+        info["screening_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+
+    probs = np.zeros(len(windows), dtype=np.float32)
+    if keep.any():
+        # 4. Feature Extraction (Wavelet db4 ou potência por banda via FFT)
+        # Isso transforma o sinal bruto em tensores que a rede entende
+        X = get_feature_extractor(features)(raw, windows[keep])
+
+        # 5. Normalização (CRUCIAL)
+        # Achatamos para 2D -> aplicamos a régua do treino -> voltamos para 3D
+        N, T, F = X.shape
+        X_flat = X.reshape(-1, F)
+        X_scaled = scaler.transform(X_flat).reshape(N, T, F)
+
+        # 6. Inferência (Predição)
+        if verbose:
+            print("--- Analisando Atividade Cerebral ---")
+        # verbose=1 mostra barra de progresso (apenas no formato keras)
+        probs[keep] = np.asarray(predict(X_scaled, verbose=verbose)).flatten()
+    info["model_s"] = time.perf_counter() - t0
+    return probs, info
+
+
+# ==========================================================================
+# Tudo o que muda as probabilidades além do EDF/modelo/scaler (chave do cache)
+# ==========================================================================
+def preprocessing_params(screening=None, features=FEATURES):
+    from processors.features import FEATURE_PARAMS
+    return {
+        "l_freq": L_FREQ, "h_freq": H_FREQ, "sfreq": TARGET_SFREQ,
+        "window_s": WINDOW_S, "step_s": STEP_S,
+        "features": features, "feature_params": FEATURE_PARAMS[features],
+        "screening": screening,
+    }
+
+
+# ==========================================================================
+# Carrega modelo e scaler uma vez por processo (reaproveitados entre arquivos)
+# ==========================================================================
+_ARTIFACTS = {}
+
+
+def load_artifacts(model_path=MODEL_PATH, scaler_path=SCALER_PATH, model_format='auto'):
+    key = (model_path, scaler_path, model_format)
+    if key not in _ARTIFACTS:
+        from models.runtime import load_predictor, load_scaler
+
+        print(f"--- Carregando Artefatos ---")
+        predict, used_format = load_predictor(model_path, fmt=model_format)
+        scaler = load_scaler(scaler_path)
+        print(f"Modelo ({used_format}) e Scaler carregados.")
+        _ARTIFACTS[key] = (predict, scaler)
+    return _ARTIFACTS[key]
+
+
+# ===========================================================================
+# Caminho da entrada do cache para a gravação (None sem cache ou sem modelo).
+# Com edf_digest (conteúdo já conhecido) o EDF não precisa estar em disco
+# ===========================================================================
+def probabilities_cache_path(edf_path, model_path=MODEL_PATH, scaler_path=SCALER_PATH, model_format='auto',
+                             screening=None, cache_dir=CACHE_DIR, features=FEATURES, edf_digest=None):
+    from models.runtime import resolve_model_file, resolve_scaler_file
+
+    model_file, _ = resolve_model_file(model_path, fmt=model_format)
+    if not cache_dir or not os.path.exists(model_file):
+        return None
+    from utils.prob_cache import cache_key
+    _, cache_path = cache_key(edf_path, model_file, resolve_scaler_file(scaler_path),
+                              preprocessing_params(screening, features), cache_dir, edf_digest=edf_digest)
+    return cache_path
+
+
+# ===========================================================================
+# Probabilidades por janela de uma gravação, lidas do cache quando possível.
+# Retorna (probs (N,), windows (N, 2) em amostras, sfreq, info com os tempos)
+# ===========================================================================
+def get_probabilities(edf_path, model_path=MODEL_PATH, scaler_path=SCALER_PATH, model_format='auto',
+                      screening=None, cache_dir=CACHE_DIR, verbose=1, features=FEATURES, edf_digest=None):
+    # Importa as mesmas funções usadas no treino para garantir consistência
+    import time
+    from helpers.chbmit_helpers import make_windows
+
+    # Cache: mesmo EDF + modelo + scaler + pré-processamento -> pula leitura, Wavelet e modelo
+    cache_path = probabilities_cache_path(edf_path, model_path, scaler_path, model_format, screening,
+                                          cache_dir, features, edf_digest)
+    if cache_path:
+        from utils.prob_cache import load_probabilities
+        cached = load_probabilities(cache_path)
+        if cached is not None:
+            print(f"[CACHE] {len(cached['probs'])} probabilidades reaproveitadas de '{cache_path}' "
+                  f"(leitura/features/modelo economizados: {cached['info'].get('read_s', 0) + cached['info']['model_s']:.2f}s)")
+            return cached["probs"], cached["windows"], cached["sfreq"], cached["info"]
+
+    predict, scaler = load_artifacts(model_path, scaler_path, model_format)
+
+    # 2. Leitura e Pré-processamento do EDF (Igual ao chbmit_reader.py)
+    t0 = time.perf_counter()
+    raw = load_and_preprocess(edf_path)
+    read_s = time.perf_counter() - t0
+
+    # 3. Janelamento (2s janela, 0.5s passo)
+    sf = raw.info['sfreq']
+    windows = make_windows(raw.n_times, sf, window_s=WINDOW_S, step_s=STEP_S)
+    print(f"Geradas {len(windows)} janelas de análise.")
+
+    # 4-6. Triagem opcional (cascata) + Wavelet + Normalização + Inferência
+    probs, info = compute_probabilities(raw, windows, predict, scaler, screening=screening, verbose=verbose,
+                                        features=features)
+    if screening is not None:
+        print(f"[CASCATA] {info['skipped_fraction']*100:.1f}% das janelas descartadas na triagem "
+              f"({info['screening_s']:.2f}s triagem + {info['model_s']:.2f}s features/modelo)")
+    info["read_s"] = read_s
+
+    if cache_path:
+        from utils.prob_cache import save_probabilities
+        save_probabilities(cache_path, probs, windows, sf, info)
+    return probs, windows, sf, info
+
+
+def predict_pipeline(edf_path, model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+                     threshold=THRESHOLD_CONFIDENCE, min_consecutive=MIN_CONSECUTIVE_WINDOWS,
+                     model_format='auto', plot_path=None, screening_path=None, cache_dir=CACHE_DIR,
+                     merge_gap=MERGE_GAP_WINDOWS, features=FEATURES):
+    # 1. Validação de Arquivos (antes de qualquer import pesado)
+    if not os.path.exists(model_path) or not os.path.exists(scaler_path):
+        print("ERRO CRÍTICO: Você precisa treinar o modelo primeiro (rode train.py).")
+        print(f"Certifique-se de que '{model_path}' e '{scaler_path}' existem.")
+        return None
+    if not os.path.exists(edf_path):
+        print(f"ERRO: arquivo EDF não encontrado: {edf_path}")
+        return None
+    if screening_path and not os.path.exists(screening_path):
+        print(f"ERRO: limiares da triagem não encontrados: {screening_path} (rode calibrate_cascade.py)")
+        return None
+
+    screening = None
+    if screening_path:
+        from processors.screening import load_screening
+        screening = load_screening(screening_path)
+
+    # 2-6. Leitura + Janelamento + Triagem opcional + Wavelet + Normalização + Inferência (ou cache)
+    probs, _, _, _ = get_probabilities(edf_path, model_path, scaler_path, model_format=model_format,
+                                       screening=screening, cache_dir=cache_dir, features=features)
+
+    raw_predictions = (probs > threshold).astype(int).flatten()
+    print(f">> Aplicando filtro: Mínimo de {min_consecutive} janelas consecutivas com confiança > {threshold*100}%")
+    final_detections = detect_sustained_events(raw_predictions, min_consecutive)
+    if merge_gap > 0:
+        final_detections = merge_close_events(final_detections, merge_gap)
+
+    # 7. Relatório Final Filtrado
+    report_events(final_detections, raw_predictions)
+
+    # O gráfico só é montado quando pedido (--plot)
+    if plot_path:
+        plot_predictions(probs, raw_predictions, final_detections, threshold, out_path=plot_path)
+
+    return probs, final_detections
+
+
+# ============================================================================
+# Gera os formatos de carga rápida (.tflite + .npz) a partir dos artefatos
+# ============================================================================
+def convert_artifacts(model_path=MODEL_PATH, scaler_path=SCALER_PATH):
+    if not os.path.exists(model_path) or not os.path.exists(scaler_path):
+        print("ERRO CRÍTICO: Você precisa treinar o modelo primeiro (rode train.py).")
+        return False
+
+    from models.runtime import convert_model_to_tflite, export_scaler_npz
+
+    print(f"[SISTEMA] Modelo convertido: {convert_model_to_tflite(model_path)}")
+    print(f"[SISTEMA] Scaler exportado: {export_scaler_npz(scaler_path)}")
+    return True
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Detector de Epilepsia em Arquivos EDF')
+    parser.add_argument('edf_file', type=str, nargs='?', help='Caminho para o arquivo .edf')
+    parser.add_argument('--model', type=str, default=None, help=f'Modelo treinado (.keras; padrão: {MODEL_PATH})')
+    parser.add_argument('--scaler', type=str, default=None, help=f'Scaler treinado (.pkl; padrão: {SCALER_PATH})')
+    parser.add_argument('--features', choices=['wavelet', 'bandpower'], default=FEATURES,
+                        help="Extrator de features do treino (o padrão de --model/--scaler segue a escolha)")
+    parser.add_argument('--model-format', choices=['auto', 'keras', 'tflite'], default='auto',
+                        help="Formato do modelo ('auto' usa o .tflite convertido se estiver atualizado)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD_CONFIDENCE, help='Confiança mínima por janela')
+    parser.add_argument('--min-windows', type=int, default=MIN_CONSECUTIVE_WINDOWS, help='Mínimo de janelas consecutivas')
+    parser.add_argument('--merge-gap', type=int, default=MERGE_GAP_WINDOWS,
+                        help='Funde eventos separados por até N janelas (ver calibrate_detection.py)')
+    parser.add_argument('--plot', nargs='?', const=PLOT_PATH, default=None, metavar='PNG',
+                        help=f"Salva o gráfico das probabilidades (padrão: {PLOT_PATH})")
+    parser.add_argument('--cascade', nargs='?', const=SCREENING_PATH, default=None, metavar='JSON',
+                        help=f"Triagem barata antes da Wavelet/modelo com limiares calibrados (padrão: {SCREENING_PATH})")
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR,
+                        help=f"Cache das probabilidades por gravação (padrão: {CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Recalcula tudo sem ler nem gravar o cache')
+    parser.add_argument('--convert', action='store_true',
+                        help='Converte modelo e scaler para os formatos de carga rápida (.tflite/.npz) e sai')
+    return parser
+
 
 if __name__ == "__main__":
     # Uso via linha de comando
-    parser = argparse.ArgumentParser(description='Detector de Epilepsia em Arquivos EDF')
-    parser.add_argument('edf_file', type=str, help='Caminho para o arquivo .edf')
+    parser = build_parser()
     args = parser.parse_args()
-    
-    predict_pipeline(args.edf_file)
\ No newline at end of file
+
+    # Artefatos do train.py para o extrator escolhido (FEATURE_EXTRACTOR=...)
+    from models.runtime import artifact_paths
+    default_model, default_scaler, _ = artifact_paths('cnn_lstm', args.features)
+    args.model = args.model or default_model
+    args.scaler = args.scaler or default_scaler
+
+    if args.convert:
+        convert_artifacts(args.model, args.scaler)
+    elif args.edf_file is None:
+        parser.error("informe o arquivo .edf (ou use --convert)")
+    else:
+        predict_pipeline(
+            args.edf_file, model_path=args.model, scaler_path=args.scaler,
+            threshold=args.threshold, min_consecutive=args.min_windows,
+            model_format=args.model_format, plot_path=args.plot,
+            screening_path=args.cascade,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            merge_gap=args.merge_gap, features=args.features
+        )
@@ -0,0 +1,125 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import fft as sp_fft
+
+# Bandas clássicas do EEG (Hz); o gamma para em 45 Hz por causa do filtro passa-banda
+BANDS = (
+    ('delta', 0.5, 4.0),
+    ('theta', 4.0, 8.0),
+    ('alpha', 8.0, 13.0),
+    ('beta', 13.0, 30.0),
+    ('gamma', 30.0, 45.0),
+)
+# Sub-quadros de 1 s -> resolução de 1 Hz (delta com 3 bins, theta com 4);
+# com 0.5 s os bins seriam de 2 Hz e o delta viraria vazamento do DC.
+# Uma janela de 2 s tem 5 sub-quadros a cada 0.25 s
+FRAME_S = 1.0
+HOP_S = 0.25
+CHUNK_FRAMES = 512  # sub-quadros por bloco de FFT: limita a memória e cabe no cache da CPU
+
+
+def _band_matrix(frame, sfreq, bands):
+    # Matriz (n_freqs, n_bandas) de 0/1: potência por banda = espectro @ matriz
+    freqs = np.fft.rfftfreq(frame, d=1.0 / sfreq)
+    return np.stack([(freqs >= lo) & (freqs < hi) for _, lo, hi in bands], axis=1).astype(np.float32)
+
+
+def _frame_bandpower(frames, taper, bands_matrix):
+    # frames: (..., frame) -> log10 da potência por banda (..., n_bandas)
+    # A janela de Hann já converte para float32 (sem copiar o sinal inteiro antes);
+    # o rfft do scipy é bem mais rápido que o do numpy para muitas FFTs curtas
+    tapered = np.multiply(frames, taper, dtype=np.float32)
+    spec = sp_fft.rfft(tapered, axis=-1, workers=-1)
+    power = spec.real ** 2 + spec.imag ** 2
+    return np.log10(power @ bands_matrix + 1e-20)
+
+
+def bandpower_features_batch(segments, sfreq, frame_s=FRAME_S, hop_s=HOP_S, bands=BANDS):
+    """
+    Potência por banda em sub-quadros curtos para um lote de janelas já recortadas.
+
+    Args:
+        segments: Array 3D (N_Janelas, N_Canais, N_Amostras).
+        sfreq: Frequência de amostragem (Hz).
+        frame_s: Duração de cada sub-quadro da FFT (s).
+        hop_s: Passo entre sub-quadros (s).
+        bands: Tupla de (nome, f_min, f_max).
+
+    Returns:
+        X: Array 3D (N_Janelas, N_Bandas * N_Subquadros, N_Canais).
+    """
+    frame = int(round(frame_s * sfreq))
+    hop = int(round(hop_s * sfreq))
+    taper = np.hanning(frame).astype(np.float32)
+    B = _band_matrix(frame, sfreq, bands)
+
+    # Visão com passo (sem cópia) -> (N, C, n_sub, frame); uma única rfft para o lote
+    frames = sliding_window_view(np.asarray(segments), frame, axis=-1)[:, :, ::hop, :]
+    bp = _frame_bandpower(frames, taper, B)                     # (N, C, n_sub, n_bandas)
+    N, C, F, K = bp.shape
+    # Bandas em sequência no eixo do tempo (como cA/cD na Wavelet): (N, K*F, C)
+    return bp.transpose(0, 3, 2, 1).reshape(N, K * F, C)
+
+
+def extract_features_bandpower(raw, windows, frame_s=FRAME_S, hop_s=HOP_S, bands=BANDS, chunk_frames=CHUNK_FRAMES):
+    """
+    Recorta as janelas do sinal EEG e calcula a potência por banda (delta a gamma)
+    em sub-quadros curtos via FFT. Mesma interface/saída da extract_features_wavelet.
+
+    Quando os inícios das janelas caem na grade dos sub-quadros (o caso normal:
+    passo de 0.5 s e sub-quadros a cada 0.25 s), cada sub-quadro do arquivo é
+    transformado uma única vez e compartilhado pelas janelas que se sobrepõem;
+    a FFT roda em blocos de 'chunk_frames' sub-quadros.
+
+    Args:
+        raw: Objeto MNE carregado com os dados (ou array (N_Canais, N_Amostras) a 256 Hz).
+        windows: Array numpy (N, 2) com índices [start, end].
+        frame_s: Duração de cada sub-quadro da FFT (s).
+        hop_s: Passo entre sub-quadros (s).
+        bands: Tupla de (nome, f_min, f_max).
+        chunk_frames: Sub-quadros por bloco de FFT.
+
+    Returns:
+        X: Array 3D (N_Janelas, N_Bandas * N_Subquadros, N_Canais).
+    """
+    if isinstance(raw, np.ndarray):
+        data, sfreq = raw, 256.0
+    else:
+        data, sfreq = raw.get_data(), float(raw.info['sfreq'])
+    windows = np.asarray(windows)
+    if len(windows) == 0:
+        return np.zeros((0, 0, data.shape[0]), dtype=np.float32)
+
+    frame = int(round(frame_s * sfreq))
+    hop = int(round(hop_s * sfreq))
+    w = int(windows[0, 1] - windows[0, 0])
+    n_sub = (w - frame) // hop + 1
+    starts = windows[:, 0]
+
+    if np.any(starts % hop):
+        # Janelas fora da grade: FFT por janela, em lotes
+        per_chunk = max(1, chunk_frames // n_sub)
+        return np.concatenate([
+            bandpower_features_batch(np.stack([data[:, s:s + w] for s in starts[i:i + per_chunk]]), sfreq,
+                                     frame_s, hop_s, bands)
+            for i in range(0, len(starts), per_chunk)
+        ])
+
+    # Grade global de sub-quadros: só o trecho coberto pelas janelas
+    first = int(starts.min()) // hop
+    last = int(starts.max()) // hop + n_sub
+    taper = np.hanning(frame).astype(np.float32)
+    B = _band_matrix(frame, sfreq, bands)
+    signal = data[:, first * hop:(last - 1) * hop + frame]
+    grid = sliding_window_view(signal, frame, axis=-1)[:, ::hop, :]   # (C, n_grade, frame)
+
+    bp = np.empty((grid.shape[1], len(bands), data.shape[0]), dtype=np.float32)
+    for i in range(0, grid.shape[1], chunk_frames):
+        # (C, bloco, K) -> (bloco, K, C)
+        bp[i:i + chunk_frames] = _frame_bandpower(grid[:, i:i + chunk_frames], taper, B).transpose(1, 2, 0)
+
+    # Cada janela pega seus n_sub sub-quadros da grade: (N, n_sub, K, C) -> (N, K*n_sub, C)
+    idx = (starts // hop - first)[:, None] + np.arange(n_sub)[None, :]
+    X = bp[idx]
+    N = len(windows)
+    return X.transpose(0, 2, 1, 3).reshape(N, len(bands) * n_sub, data.shape[0])
@@ -0,0 +1,44 @@
+import numpy as np
+
+from processors.wavelet import extract_features_wavelet, wavelet_features_batch
+from processors.bandpower import (extract_features_bandpower, bandpower_features_batch,
+                                  FRAME_S, HOP_S, BANDS)
+
+# Extratores selecionáveis: todos recebem (raw, windows) e devolvem (N, T, Canais)
+FEATURE_EXTRACTORS = {
+    'wavelet': extract_features_wavelet,
+    'bandpower': extract_features_bandpower,
+}
+
+# Versões em lote (janelas já recortadas), usadas no monitoramento em tempo real:
+# (segmentos (N, Canais, Amostras), sfreq) -> (N, T, Canais), iguais às de cima
+BATCH_FEATURE_EXTRACTORS = {
+    'wavelet': lambda segments, sfreq: wavelet_features_batch(segments),
+    'bandpower': bandpower_features_batch,
+}
+
+# Parâmetros de cada extrator (entram na chave do cache de probabilidades)
+FEATURE_PARAMS = {
+    'wavelet': {"wavelet": 'db4', "level": 4},
+    'bandpower': {"frame_s": FRAME_S, "hop_s": HOP_S, "bands": [list(b) for b in BANDS]},
+}
+
+
+def get_feature_extractor(name):
+    """Função (raw, windows) -> X do extrator 'name' de FEATURE_EXTRACTORS."""
+    if name not in FEATURE_EXTRACTORS:
+        raise ValueError(f"Extrator desconhecido: {name} (opções: {', '.join(FEATURE_EXTRACTORS)})")
+    return FEATURE_EXTRACTORS[name]
+
+
+def get_batch_feature_extractor(name):
+    """Função (segmentos, sfreq) -> X do extrator 'name' de BATCH_FEATURE_EXTRACTORS."""
+    if name not in BATCH_FEATURE_EXTRACTORS:
+        raise ValueError(f"Extrator desconhecido: {name} (opções: {', '.join(BATCH_FEATURE_EXTRACTORS)})")
+    return BATCH_FEATURE_EXTRACTORS[name]
+
+
+def feature_input_shape(name, n_channels=23, sfreq=256.0, window_s=2.0):
+    """Formato (TimeSteps, Canais) que o extrator entrega para uma janela."""
+    segment = np.zeros((1, n_channels, int(round(window_s * sfreq))))
+    return get_batch_feature_extractor(name)(segment, sfreq).shape[1:]
@@ -0,0 +1,114 @@
+import json
+import numpy as np
+
+SCREENING_FEATURES = ("line_length", "energy", "amplitude_range")
+DEFAULT_MARGIN = 0.8
+
+
+def extract_screening_features(raw, windows, relative=True):
+    """
+    Estatísticas baratas por janela para a triagem da cascata (1º estágio).
+
+    Tudo é vetorizado sobre o sinal já filtrado: comprimento de linha, energia e
+    amplitude pico a pico saem de reduções por blocos do passo das janelas. Cada
+    estatística é calculada por canal e reduzida pelo máximo entre canais, para
+    não perder crises focais.
+
+    Args:
+        raw: Objeto MNE carregado (ou array (N_Canais, N_Amostras)).
+        windows: Array numpy (N, 2) com índices [start, end] (mesmo tamanho).
+        relative: Divide cada estatística pela mediana da gravação, tornando os
+                  limiares independentes do ganho de cada paciente/montagem.
+
+    Returns:
+        F: Array 2D (N_Janelas, 3) na ordem de SCREENING_FEATURES.
+    """
+    data = raw if isinstance(raw, np.ndarray) else raw.get_data()
+    windows = np.asarray(windows)
+    if len(windows) == 0:
+        return np.zeros((0, len(SCREENING_FEATURES)))
+
+    starts, ends = windows[:, 0], windows[:, 1]
+    w = int(ends[0] - starts[0])
+    C = data.shape[0]
+
+    # Reduções por blocos (tamanho = mdc entre janela e inícios) e depois sobre os
+    # k blocos de cada janela: uma passada no sinal, sem materializar (C, N, w).
+    b = int(np.gcd.reduce(np.append(starts, w)))
+    k = w // b
+    nb = int(ends.max()) // b
+    idx = starts // b
+    blocks = data[:, :nb * b].reshape(C, nb, b)
+
+    def per_window(block_stat, reduce):
+        return reduce(np.lib.stride_tricks.sliding_window_view(block_stat, k, axis=1)[:, idx], axis=-1)
+
+    # Comprimento de linha: soma de |x[t+1] - x[t]| dentro da janela
+    # (a diferença que sai da janela, no fim de cada uma, é descontada)
+    abs_diff = np.abs(np.diff(data[:, :nb * b], axis=1, append=0.0))
+    line_length = per_window(abs_diff.reshape(C, nb, b).sum(axis=-1), np.sum) - abs_diff[:, ends - 1]
+
+    energy = per_window(np.einsum("cnb,cnb->cn", blocks, blocks), np.sum) / w
+    amplitude_range = per_window(blocks.max(axis=-1), np.max) - per_window(blocks.min(axis=-1), np.min)
+
+    F = np.stack([line_length.max(axis=0), energy.max(axis=0), amplitude_range.max(axis=0)], axis=1)
+    if relative:
+        med = np.median(F, axis=0)
+        F = F / np.where(med > 0, med, 1.0)
+    return F
+
+
+def screen_windows(F, thresholds):
+    """
+    Máscara das janelas que seguem para a Wavelet + modelo (2º estágio).
+
+    Uma janela só é descartada como "claramente normal" quando alguma estatística
+    fica abaixo do menor valor visto em janelas de crise na calibração.
+    """
+    return np.all(F >= np.asarray(thresholds)[None, :], axis=1)
+
+
+def calibrate_screening(F, y, margin=DEFAULT_MARGIN, relative=True):
+    """
+    Define os limiares da triagem sem descartar nenhuma janela de crise rotulada.
+
+    Args:
+        F: Estatísticas (N, 3) de extract_screening_features (todas as gravações).
+        y: Rótulos (N,) de label_windows.
+        margin: Fator (<= 1) aplicado ao mínimo das crises, folga para dados novos.
+        relative: Se F foi calculado com relative=True (guardado junto dos limiares).
+
+    Returns:
+        Dict com limiares, margem e a fração de janelas normais descartadas.
+    """
+    F = np.asarray(F)
+    y = np.asarray(y).astype(bool)
+    if not y.any():
+        raise ValueError("Calibração exige pelo menos uma janela de crise rotulada")
+    if not 0 < margin <= 1:
+        raise ValueError(f"margin deve estar em (0, 1], recebido {margin}")
+
+    thresholds = F[y].min(axis=0) * margin
+    keep = screen_windows(F, thresholds)
+    assert keep[y].all()
+
+    return {
+        "features": list(SCREENING_FEATURES),
+        "thresholds": thresholds.tolist(),
+        "margin": margin,
+        "relative": relative,
+        "n_windows": int(len(y)),
+        "n_seizure_windows": int(y.sum()),
+        "skipped_fraction": float(1.0 - keep.mean()),
+        "skipped_normal_fraction": float(1.0 - keep[~y].mean()) if (~y).any() else 0.0,
+    }
+
+
+def save_screening(params, path):
+    with open(path, "w") as f:
+        json.dump(params, f, indent=2)
+
+
+def load_screening(path):
+    with open(path) as f:
+        return json.load(f)
@@ -2,6 +2,24 @@ import numpy as np
 import pywt
 from tqdm import tqdm
 
+def wavelet_features_batch(segments, wavelet='db4', level=4):
+    """
+    Mesma feature da extract_features_wavelet para um lote de janelas já recortadas.
+
+    Args:
+        segments: Array 3D (N_Janelas, N_Canais, N_Amostras).
+        wavelet: Nome da wavelet (ex: 'db4', 'sym5').
+        level: Nível de decomposição.
+
+    Returns:
+        X: Array 3D (N_Janelas, Time_Steps_Reduzido, N_Canais).
+    """
+    # wavedec aceita eixos extras: uma chamada para o lote inteiro
+    coeffs = pywt.wavedec(segments, wavelet, level=level, axis=-1)
+    features = np.concatenate([coeffs[0], coeffs[1]], axis=-1)
+    return features.transpose(0, 2, 1)
+
+
 def extract_features_wavelet(raw, windows, wavelet='db4', level=4):
     """
     Recorta as janelas do sinal EEG bruto e aplica Transformada Wavelet.
@@ -1,34 +1,28 @@
 import mne
-import os
-import tempfile
 from typing import Tuple, Optional
 import numpy as np
 
-from utils.drive_utils import stream_file_bytes
+from utils.drive_utils import stream_file_to_path, local_file_path, download_path, remove_download
 from helpers.chbmit_helpers import get_patient_folder_id, list_patient_edfs, make_windows, get_intervals_from_drive, label_windows
 
 # ==============================================================================
-# Faz download em memória, grava em um arquivo temporário .edf
-# e passa o caminho para o MNE (compatível com versões que não aceitam BytesIO).
+# Faz download (intervalos paralelos) para um caminho fixo por file id e passa
+# o caminho para o MNE (compatível com versões que não aceitam BytesIO).
+# Se o download falhar, o arquivo parcial e o .parts ficam para a próxima
+# chamada retomar; só depois de carregado com sucesso o arquivo é removido.
+# Com um espelho local (LocalSource) o MNE lê o arquivo original, sem cópia.
 # ==============================================================================
 def read_edf_from_drive(service, edf_file_id: str,
                         l_freq: float = 0.5, h_freq: float = 45.0,
                         resample_hz: Optional[float] = 256.0) -> mne.io.BaseRaw:
-    data_bytes = stream_file_bytes(service, edf_file_id)
-
-    # cria arquivo temporário
-    with tempfile.NamedTemporaryFile(suffix=".edf", delete=False) as tmp:
-        tmp_path = tmp.name
-        tmp.write(data_bytes)
-
-    try:
-        raw = mne.io.read_raw_edf(tmp_path, preload=True, verbose=False)
-    finally:
-        # remove o arquivo temporário depois de carregar
-        try:
-            os.remove(tmp_path)
-        except OSError:
-            pass
+    local_path = local_file_path(service, edf_file_id)
+    if local_path is not None:
+        raw = mne.io.read_raw_edf(local_path, preload=True, verbose=False)
+    else:
+        path = download_path(edf_file_id)
+        stream_file_to_path(service, edf_file_id, path, verbose=True)
+        raw = mne.io.read_raw_edf(path, preload=True, verbose=False)
+        remove_download(path)
 
     if l_freq is not None or h_freq is not None:
         raw.filter(l_freq=l_freq, h_freq=h_freq, fir_design="firwin", verbose=False)
@@ -40,20 +34,24 @@ def read_edf_from_drive(service, edf_file_id: str,
 
 # ==============================================================
 # Constrói janelas e rótulos a partir do EDF e arquivos de anota
+# (patient_id/edf_row opcionais evitam refazer as buscas no Drive)
 # ==============================================================
-def build_windows_and_labels(service, root_folder_id: str, patient: str, edf_name: str, window_s: float = 2.0, step_s = 0.5, prediction_horizon_s: float = 0.0) -> Tuple[mne.io.BaseRaw, np.ndarray, np.ndarray]:
-  patient_id = get_patient_folder_id(service, root_folder_id, patient)
+def build_windows_and_labels(service, root_folder_id: str, patient: str, edf_name: str, window_s: float = 2.0, step_s = 0.5, prediction_horizon_s: float = 0.0,
+                             patient_id: Optional[str] = None, edf_row: Optional[dict] = None) -> Tuple[mne.io.BaseRaw, np.ndarray, np.ndarray]:
+  if patient_id is None:
+    patient_id = get_patient_folder_id(service, root_folder_id, patient)
   assert patient_id, f"Paciente {patient} não encontrado em {root_folder_id}"
 
   # Encontra o arquivo
-  edfs = list_patient_edfs(service, patient_id)
-  hit = next((r for r in edfs if r["name"] == edf_name), None)
-  assert hit, f"EDF {edf_name} não encontrado para o paciente {patient}"
+  if edf_row is None:
+    edfs = list_patient_edfs(service, patient_id)
+    edf_row = next((r for r in edfs if r["name"] == edf_name), None)
+    assert edf_row, f"EDF {edf_name} não encontrado para o paciente {patient}"
 
   # Leitura + janelas + rótulos
-  raw = read_edf_from_drive(service, hit["id"])
+  raw = read_edf_from_drive(service, edf_row["id"])
   sf = float(raw.info["sfreq"])
   windows = make_windows(raw.n_times, sf, window_s=window_s, step_s=step_s)
-  intervals = get_intervals_from_drive(service, patient_id, edf_name)
+  intervals = get_intervals_from_drive(service, edf_name, edf_row["seizures_id"], edf_row["summary_id"])
   y = label_windows(windows, sf, intervals, prediction_horizon_s=prediction_horizon_s)
   return raw, windows, y
\ No newline at end of file
@@ -1,13 +1,13 @@
-from drive_connection import auth_drive
+from data_source import connect_data_source
 from helpers.chbmit_helpers import list_patient_edfs, get_patient_folder_id, get_intervals_from_drive
 from readers.chbmit_reader import build_windows_and_labels
 from processors.wavelet import extract_features_wavelet
 
-FOLDER_ID = "1nJm3E6XnYVVFz2itBBdC-qtSab6GZmLO" # ID da pasta '1.0.0' no Google Drive
 PATIENT = "chb01"
 
 if __name__ == "__main__":
-  service = auth_drive()
+  # Drive ou espelho local, conforme CHBMIT_BACKEND (ver data_source.py)
+  service, FOLDER_ID = connect_data_source()
   patient_id = get_patient_folder_id(service, FOLDER_ID, PATIENT)
   assert patient_id, f"Paciente {PATIENT} não encontrado em {FOLDER_ID}"
 
@@ -26,7 +26,7 @@ if __name__ == "__main__":
     sf = float(raw.info["sfreq"])
 
     patient_id = get_patient_folder_id(service, FOLDER_ID, PATIENT)
-    intervals = get_intervals_from_drive(service, patient_id, edf_row["name"])
+    intervals = get_intervals_from_drive(service, edf_row["name"], edf_row["seizures_id"], edf_row["summary_id"])
     print("intervalos de crise:", intervals)
 
     print(f"sfreq={sf} Hz | windows={windows.shape[0]} | positivos={int(y.sum())}")
@@ -1,3 +1,4 @@
+import os
 import numpy as np
 import tensorflow as tf
 from sklearn.model_selection import train_test_split
@@ -6,19 +7,20 @@ from sklearn.utils.class_weight import compute_class_weight
 from sklearn.preprocessing import StandardScaler 
 from sklearn.preprocessing import RobustScaler
 
-from drive_connection import auth_drive
-from helpers.chbmit_helpers import get_patient_folder_id, list_patient_edfs
+from data_source import connect_data_source, DRIVE_FOLDER_ID
+from helpers.chbmit_helpers import get_patient_folder_ids, batch_list_patient_edfs
 from readers.chbmit_reader import build_windows_and_labels
-from processors.wavelet import extract_features_wavelet
-from models.hybrid_model import build_cnn_lstm_model
+from processors.features import get_feature_extractor
+from models.zoo import build_model, distillation_targets, hard_label_accuracy, DISTILLED_MODELS
+from models.runtime import artifact_paths
 
 import joblib
 
 import matplotlib.pyplot as plt
 
-def plot_training_history(history):
-    acc = history.history['accuracy']
-    val_acc = history.history['val_accuracy']
+def plot_training_history(history, out_path='resultado_treino.png', acc_key='accuracy'):
+    acc = history.history[acc_key]
+    val_acc = history.history[f'val_{acc_key}']
     loss = history.history['loss']
     val_loss = history.history['val_loss']
     epochs_range = range(len(acc))
@@ -39,32 +41,49 @@ def plot_training_history(history):
     plt.grid(True, alpha=0.3)
 
     plt.tight_layout()
-    plt.savefig('resultado_treino.png')
-    print("\n[INFO] Gráfico salvo como 'resultado_treino.png'")
+    plt.savefig(out_path)
+    print(f"\n[INFO] Gráfico salvo como '{out_path}'")
 
 # --- CONFIGURAÇÕES ---
-FOLDER_ID = "1nJm3E6XnYVVFz2itBBdC-qtSab6GZmLO"
+FOLDER_ID = DRIVE_FOLDER_ID  # usado só com CHBMIT_BACKEND=drive
 PATIENTS = [f"chb{i:02d}" for i in range(1, 25)]
 EPOCHS = 50
 BATCH_SIZE = 16    
 
+# Arquitetura treinada (ver models/zoo.py): cnn_lstm, tcn, separable_cnn, cnn_gru, student
+MODEL_NAME = os.environ.get("MODEL_ARCH", "cnn_lstm")
+# Extrator de features (ver processors/features.py): wavelet (db4) ou bandpower (FFT)
+FEATURES = os.environ.get("FEATURE_EXTRACTOR", "wavelet")
+# Destilação (só para o 'student'): o CNN-LSTM já treinado é o professor
+TEACHER_NAME = "cnn_lstm"
+DISTILL_ALPHA = 0.5
+DISTILL_TEMPERATURE = 2.0
+
 def main():
     print("--- INICIANDO TREINAMENTO ROBUSTO COM MÚLTIPLOS PACIENTES ---")
-    service = auth_drive()
+    print(f"[MODELO] Arquitetura: {MODEL_NAME} | Features: {FEATURES}")
+    model_path, scaler_path, plot_path = artifact_paths(MODEL_NAME, FEATURES)
+    extract_features = get_feature_extractor(FEATURES)
+    # Drive ou espelho local, conforme CHBMIT_BACKEND (ver data_source.py)
+    service, root_id = connect_data_source(drive_folder_id=FOLDER_ID)
     
     all_X = []
     all_y = []
+
+    # Duas requisições em lote: pastas de todos os pacientes e o conteúdo delas
+    patient_ids = get_patient_folder_ids(service, root_id, PATIENTS)
+    patient_edfs = batch_list_patient_edfs(service, patient_ids)
     
     for patient in PATIENTS:
         print(f"\n>> Processando paciente: {patient}")
         try:
-            patient_id = get_patient_folder_id(service, FOLDER_ID, patient)
+            patient_id = patient_ids.get(patient)
             
             if patient_id is None:
-                print(f"  [Skip] Paciente {patient} não encontrado no Drive")
+                print(f"  [Skip] Paciente {patient} não encontrado na fonte de dados")
                 continue
             
-            edfs = list_patient_edfs(service, patient_id)
+            edfs = patient_edfs[patient]
             
             if len(edfs) == 0:
                 print(f"  [Skip] Paciente {patient} não possui arquivos EDF")
@@ -82,11 +101,12 @@ def main():
             for edf_row in training_files:
                 try:
                     raw, windows, y = build_windows_and_labels(
-                        service, FOLDER_ID, patient, edf_row["name"],
-                        window_s=2.0, step_s=0.5
+                        service, root_id, patient, edf_row["name"],
+                        window_s=2.0, step_s=0.5,
+                        patient_id=patient_id, edf_row=edf_row
                     )
                     if len(windows) > 0:
-                        X = extract_features_wavelet(raw, windows)
+                        X = extract_features(raw, windows)
                         all_X.append(X)
                         all_y.append(y)
                         print(f"    [OK] {edf_row['name']}: {len(windows)} janelas")
@@ -148,7 +168,7 @@ def main():
     X_test_scaled = scaler.transform(X_test_reshaped).reshape(X_test.shape[0], T, F)
     
     print("[SISTEMA] Salvando o Scaler para uso futuro...")
-    joblib.dump(scaler, 'scaler_treinado.pkl')
+    joblib.dump(scaler, scaler_path)
 
     print(">> Dados Normalizados.")
 
@@ -156,14 +176,30 @@ def main():
     class_weights = compute_class_weight('balanced', classes=np.unique(y_train), y=y_train)
     class_weights_dict = dict(enumerate(class_weights))
 
-    model = build_cnn_lstm_model((T, F))
+    model = build_model(MODEL_NAME, (T, F))
+
+    # Alvos do treino: rótulos reais, ou misturados com o professor na destilação
+    y_fit = y_train
+    accuracy, acc_key = 'accuracy', 'accuracy'
+    if MODEL_NAME in DISTILLED_MODELS:
+        # O professor precisa ter sido treinado com as mesmas features
+        teacher_path, teacher_scaler_path, _ = artifact_paths(TEACHER_NAME, FEATURES)
+        print(f"[DESTILAÇÃO] Professor: {teacher_path}")
+        teacher = tf.keras.models.load_model(teacher_path, compile=False)
+        # O professor vê as janelas normalizadas com o scaler dele
+        teacher_scaler = joblib.load(teacher_scaler_path)
+        X_teacher = teacher_scaler.transform(X_train_reshaped).reshape(N, T, F)
+        teacher_probs = teacher.predict(X_teacher, batch_size=256, verbose=0)
+        y_fit = distillation_targets(y_train, teacher_probs, alpha=DISTILL_ALPHA, temperature=DISTILL_TEMPERATURE)
+        # Alvos suaves: a acurácia compara com os rótulos arredondados
+        accuracy, acc_key = hard_label_accuracy, 'hard_label_accuracy'
     
     optimizer = tf.keras.optimizers.Adam(learning_rate=0.0001)
     
     model.compile(
         optimizer=optimizer, 
         loss='binary_crossentropy', 
-        metrics=['accuracy']
+        metrics=[accuracy]
     )
 
     early_stop = tf.keras.callbacks.EarlyStopping(
@@ -171,7 +207,7 @@ def main():
     )
 
     history = model.fit(
-        X_train_scaled, y_train,
+        X_train_scaled, y_fit,
         epochs=EPOCHS,
         batch_size=BATCH_SIZE,
         validation_data=(X_test_scaled, y_test),
@@ -180,8 +216,9 @@ def main():
         verbose=1
     )
 
-    plot_training_history(history)
-    model.save("modelo_final_epilepsia.keras")
+    plot_training_history(history, plot_path, acc_key=acc_key)
+    model.save(model_path)
+    print(f"[SISTEMA] Modelo salvo em '{model_path}' (scaler: '{scaler_path}')")
 
     # --- AVALIAÇÃO ---
     print("\n--- RESULTADOS FINAIS ---")
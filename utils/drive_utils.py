@@ -1,30 +1,57 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import contextlib
 import io
-from googleapiclient.http import MediaIoBaseDownload
+import os
+import tempfile
+import threading
+
+from utils.ranged_download import download_ranges, format_stats, DEFAULT_CHUNK_SIZE, DEFAULT_WORKERS, STATE_SUFFIX
+from utils.local_source import LocalSource
+
+DRIVE_MEDIA_URL = "https://www.googleapis.com/drive/v3/files/{file_id}?alt=media"
+LIST_FIELDS = "nextPageToken, files(id,name,mimeType,parents)"
+BATCH_MAX_REQUESTS = 100  # limite da API do Drive por requisição em lote
+
+# Configuração do download paralelo (pode ser alterada antes do treino)
+DOWNLOAD_CHUNK_SIZE = DEFAULT_CHUNK_SIZE
+DOWNLOAD_WORKERS = DEFAULT_WORKERS
+
+# Downloads ficam num caminho fixo por file id: um download interrompido é
+# retomado na próxima chamada (progresso em <arquivo>.parts)
+DOWNLOAD_DIR = os.environ.get("SEIZURE_DOWNLOAD_DIR", os.path.join(tempfile.gettempdir(), "chbmit_downloads"))
 
 # ===============================================================================
 # Lista todos os arquivos e pastas dentro de uma pasta específica no Google Drive
 # ===============================================================================
 def list_children(service, folder_id: str, q_extra: str = ""):
+  if isinstance(service, LocalSource):
+    return service.list_children(folder_id, q_extra)
   q = f"'{folder_id}' in parents and trashed = false"
   if q_extra:
       q += f" and {q_extra}"
   try:
     res = service.files().list(
       q=q,
-      fields="nextPageToken, files(id,name,mimeType,parents)"
+      fields=LIST_FIELDS
     ).execute()
   except Exception as e:
     print(f"[ERRO list_children] Falha ao listar filhos de {folder_id}: {e}")
     return []
 
+  return _list_remaining_pages(service, q, res)
+
+
+# =====================================================================
+# Segue o nextPageToken de uma listagem cuja primeira página já chegou
+# =====================================================================
+def _list_remaining_pages(service, q: str, res: Dict) -> List[Dict]:
   items = res.get("files", [])
   while res.get("nextPageToken"):
     try:
       res = service.files().list(
         q=q,
         pageToken=res["nextPageToken"],
-        fields="nextPageToken, files(id,name,mimeType,parents)"
+        fields=LIST_FIELDS
       ).execute()
       items.extend(res.get("files", []))
     except Exception as e:
@@ -36,15 +63,119 @@ def list_children(service, folder_id: str, q_extra: str = ""):
 # Encontra um arquivo ou pasta pelo nome dentro de uma pasta específica no Google Drive
 # ====================================================================================
 def find_by_name_in_folder(service, folder_id: str, name: str) -> Optional[Dict]:
+  if isinstance(service, LocalSource):
+    return service.find_by_name(folder_id, name)
   q = f"'{folder_id}' in parents and name = '{name}' and trashed = false"
   res = service.files().list(q=q, fields="files(id, name, mimeType, parents)").execute()
   files = res.get("files", [])
   return files[0] if files else None
 
-# =================================================================
-# Faz o download de um arquivo do Google Drive e retorna seus bytes
-# =================================================================
-def stream_file_bytes(service, file_id: str) -> bytes:
+# ==============================================================================
+# Executa várias chamadas da API em requisições em lote (até 100 por ida e volta).
+# Retorna, na ordem de entrada, a resposta de cada chamada ou a exceção recebida.
+# ==============================================================================
+def _execute_batch(service, requests: List) -> List:
+  results: List = [None] * len(requests)
+
+  def callback(request_id, response, exception):
+    results[int(request_id)] = exception if exception is not None else response
+
+  for base in range(0, len(requests), BATCH_MAX_REQUESTS):
+    batch = service.new_batch_http_request(callback=callback)
+    for i, req in enumerate(requests[base:base + BATCH_MAX_REQUESTS]):
+      batch.add(req, request_id=str(base + i))
+    batch.execute()
+  return results
+
+
+# ====================================================================================
+# Versão em lote de list_children: queries = [(folder_id, q_extra), ...].
+# As primeiras páginas vêm todas em uma só ida e volta; páginas extras seguem depois.
+# ====================================================================================
+def batch_list_children(service, queries: List[Tuple[str, str]]) -> List[List[Dict]]:
+  if isinstance(service, LocalSource):
+    return [service.list_children(folder_id, q_extra) for folder_id, q_extra in queries]
+
+  qs = []
+  for folder_id, q_extra in queries:
+    q = f"'{folder_id}' in parents and trashed = false"
+    if q_extra:
+      q += f" and {q_extra}"
+    qs.append(q)
+
+  try:
+    responses = _execute_batch(service, [service.files().list(q=q, fields=LIST_FIELDS) for q in qs])
+  except Exception as e:
+    print(f"[ERRO batch_list_children] Falha no lote, usando chamadas individuais: {e}")
+    return [list_children(service, folder_id, q_extra) for folder_id, q_extra in queries]
+
+  out = []
+  for (folder_id, _), q, res in zip(queries, qs, responses):
+    if isinstance(res, Exception):
+      print(f"[ERRO batch_list_children] Falha ao listar filhos de {folder_id}: {res}")
+      out.append([])
+    else:
+      out.append(_list_remaining_pages(service, q, res))
+  return out
+
+
+# ==================================================================
+# Monta os headers de autenticação a partir das credenciais do service
+# (renovando o token se expirar no meio de um download longo)
+# ==================================================================
+def _auth_headers_fn(service):
+  creds = getattr(getattr(service, "_http", None), "credentials", None)
+  if creds is None:
+    return None
+  lock = threading.Lock()
+
+  def headers() -> Dict[str, str]:
+    with lock:
+      if not creds.valid:
+        from google.auth.transport.requests import Request
+        creds.refresh(Request())
+      h: Dict[str, str] = {}
+      creds.apply(h)
+      return h
+
+  return headers
+
+
+# ==============================================================================
+# Identidade do conteúdo pelos metadados do Drive (md5Checksum + tamanho), sem
+# baixar o arquivo. None no espelho local (lá o arquivo já está em disco) ou
+# quando o Drive não informa o checksum
+# ==============================================================================
+def drive_content_digest(service, file_id: str) -> Optional[str]:
+  if isinstance(service, LocalSource):
+    return None
+  try:
+    meta = service.files().get(fileId=file_id, fields="md5Checksum,size").execute()
+  except Exception as e:
+    print(f"[ERRO drive_content_digest] {file_id}: {e}")
+    return None
+  if not meta.get("md5Checksum") or meta.get("size") is None:
+    return None
+  return f"drive-md5:{meta['md5Checksum']}:{meta['size']}"
+
+
+def get_file_size(service, file_id: str) -> Optional[int]:
+  try:
+    meta = service.files().get(fileId=file_id, fields="size").execute()
+  except Exception as e:
+    print(f"[ERRO get_file_size] {file_id}: {e}")
+    return None
+  size = meta.get("size")
+  # Documentos nativos do Google não têm 'size'
+  return int(size) if size is not None else None
+
+
+# ==========================================================
+# Download sequencial original (fallback sem credenciais/size)
+# ==========================================================
+def _stream_file_bytes_sequential(service, file_id: str) -> bytes:
+  # Import local: quem só usa make_windows/label_windows (ex.: predict.py) não paga o googleapiclient
+  from googleapiclient.http import MediaIoBaseDownload
   req = service.files().get_media(fileId=file_id)
   buf = io.BytesIO()
   down = MediaIoBaseDownload(buf, req)
@@ -54,6 +185,90 @@ def stream_file_bytes(service, file_id: str) -> bytes:
   buf.seek(0)
   return buf.read()
 
+
+def _ranged_download(service, file_id: str, dest: Optional[str], chunk_size: Optional[int],
+                     workers: Optional[int], verbose: bool):
+  headers = _auth_headers_fn(service)
+  size = get_file_size(service, file_id) if headers is not None else None
+  if headers is None or size is None:
+    return None
+
+  data, stats = download_ranges(
+    DRIVE_MEDIA_URL.format(file_id=file_id), size=size, dest=dest, headers=headers,
+    chunk_size=chunk_size or DOWNLOAD_CHUNK_SIZE, workers=workers or DOWNLOAD_WORKERS
+  )
+  if verbose:
+    print(f"    [download] {file_id}: {format_stats(stats)}")
+  return data
+
+
+# =================================================================
+# Faz o download de um arquivo do Google Drive e retorna seus bytes
+# (intervalos de bytes em paralelo, com fallback para o sequencial)
+# =================================================================
+def stream_file_bytes(service, file_id: str, chunk_size: Optional[int] = None,
+                      workers: Optional[int] = None, verbose: bool = False) -> bytes:
+  if isinstance(service, LocalSource):
+    return service.read_bytes(file_id)
+  data = _ranged_download(service, file_id, None, chunk_size, workers, verbose)
+  if data is None:
+    return _stream_file_bytes_sequential(service, file_id)
+  return data
+
+
+# ==============================================================================
+# Conteúdo do arquivo como memoryview, válido só dentro do with. No LocalSource
+# é um mmap sem cópia (fechado ao sair); no Drive, os bytes baixados.
+# ==============================================================================
+@contextlib.contextmanager
+def open_file_view(service, file_id: str):
+  if isinstance(service, LocalSource):
+    with service.open_view(file_id) as view:
+      yield view
+  else:
+    yield memoryview(stream_file_bytes(service, file_id))
+
+
+# ==============================================================================
+# Faz o download direto para um arquivo local. Se o download anterior para o
+# mesmo caminho foi interrompido, retoma apenas os pedaços que faltaram.
+# ==============================================================================
+def stream_file_to_path(service, file_id: str, path: str, chunk_size: Optional[int] = None,
+                        workers: Optional[int] = None, verbose: bool = False) -> str:
+  if isinstance(service, LocalSource):
+    return service.copy_to(file_id, path)
+  out = _ranged_download(service, file_id, path, chunk_size, workers, verbose)
+  if out is None:
+    with open(path, "wb") as f:
+      f.write(_stream_file_bytes_sequential(service, file_id))
+  return path
+
+# ==========================================================================
+# Caminho estável do download de um arquivo (mesmo file id -> mesmo caminho)
+# ==========================================================================
+def download_path(file_id: str, suffix: str = ".edf", download_dir: str = DOWNLOAD_DIR) -> str:
+  os.makedirs(download_dir, exist_ok=True)
+  return os.path.join(download_dir, f"{file_id}{suffix}")
+
+
+# ======================================================================
+# Remove um download concluído e o arquivo de progresso (.parts), se houver
+# ======================================================================
+def remove_download(path: str) -> None:
+  for p in (path, path + STATE_SUFFIX):
+    try:
+      os.remove(p)
+    except OSError:
+      pass
+
+# ===========================================================================
+# Caminho local do arquivo quando o backend é um espelho em disco (senão None)
+# ===========================================================================
+def local_file_path(service, file_id: str) -> Optional[str]:
+  if isinstance(service, LocalSource):
+    return service.path(file_id)
+  return None
+
 # =========================================================================
 # Lê um arquivo de texto do Google Drive e retorna seu conteúdo como string
 # =========================================================================
@@ -0,0 +1,105 @@
+from typing import List, Dict, Optional
+import contextlib
+import mmap
+import os
+import re
+import shutil
+
+FOLDER_MIMETYPE = "application/vnd.google-apps.folder"
+FILE_MIMETYPE = "application/octet-stream"
+ROOT_ID = "."
+
+# Cláusulas de busca do Drive usadas pelos helpers: name = '..', name contains '..', mimeType = '..'
+_CLAUSE = re.compile(r"^(name|mimeType)\s*(=|contains)\s*'(.*)'$")
+
+
+# ==============================================================================
+# Espelho local do CHB-MIT com a mesma organização das pastas do Drive.
+# Os IDs são caminhos relativos à raiz (a própria raiz é '.'), então os helpers
+# de utils.drive_utils funcionam sem mudança passando um LocalSource no lugar
+# do 'service' do googleapiclient.
+# ==============================================================================
+class LocalSource:
+  def __init__(self, root: str):
+    self.root = os.path.abspath(root)
+    if not os.path.isdir(self.root):
+      raise FileNotFoundError(f"Pasta local do dataset não encontrada: {self.root}")
+
+  def __repr__(self):
+    return f"LocalSource({self.root!r})"
+
+  # ----------------- caminhos ----------------- #
+
+  def path(self, file_id: str) -> str:
+    p = os.path.normpath(os.path.join(self.root, file_id))
+    if p != self.root and not p.startswith(self.root + os.sep):
+      raise ValueError(f"ID fora da raiz local: {file_id}")
+    return p
+
+  def _item(self, entry: os.DirEntry, parent_id: str) -> Dict:
+    rel = entry.name if parent_id == ROOT_ID else f"{parent_id}/{entry.name}"
+    return {
+      "id": rel,
+      "name": entry.name,
+      "mimeType": FOLDER_MIMETYPE if entry.is_dir() else FILE_MIMETYPE,
+      "parents": [parent_id],
+    }
+
+  # ----------------- listagem ----------------- #
+
+  def list_children(self, folder_id: str, q_extra: str = "") -> List[Dict]:
+    clauses = [c.strip() for c in re.split(r"\s+and\s+", q_extra) if c.strip()] if q_extra else []
+    filters = []
+    for c in clauses:
+      m = _CLAUSE.match(c)
+      if not m:
+        raise ValueError(f"Consulta não suportada pelo LocalSource: {c}")
+      filters.append(m.groups())
+
+    try:
+      entries = sorted(os.scandir(self.path(folder_id)), key=lambda e: e.name)
+    except OSError as e:
+      print(f"[ERRO list_children] Falha ao listar filhos de {folder_id}: {e}")
+      return []
+
+    out = []
+    for entry in entries:
+      item = self._item(entry, folder_id)
+      if all(self._matches(item, field, op, value) for field, op, value in filters):
+        out.append(item)
+    return out
+
+  @staticmethod
+  def _matches(item: Dict, field: str, op: str, value: str) -> bool:
+    if op == "=":
+      return item[field] == value
+    return value.lower() in item[field].lower()
+
+  def find_by_name(self, folder_id: str, name: str) -> Optional[Dict]:
+    files = self.list_children(folder_id, f"name = '{name}'")
+    return files[0] if files else None
+
+  # ----------------- leitura ----------------- #
+
+  def read_bytes(self, file_id: str) -> bytes:
+    with open(self.path(file_id), "rb") as f:
+      return f.read()
+
+  @contextlib.contextmanager
+  def open_view(self, file_id: str):
+    """memoryview do arquivo via mmap (sem cópia), fechado ao sair do with."""
+    with open(self.path(file_id), "rb") as f:
+      if os.fstat(f.fileno()).st_size == 0:
+        yield memoryview(b"")
+        return
+      mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    try:
+      yield view
+    finally:
+      view.release()
+      mm.close()
+
+  def copy_to(self, file_id: str, dest: str) -> str:
+    shutil.copyfile(self.path(file_id), dest)
+    return dest
@@ -0,0 +1,125 @@
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import os
+
+import numpy as np
+
+CACHE_DIR = os.environ.get("SEIZURE_CACHE_DIR", ".cache_probabilidades")
+HASH_INDEX = "hashes.json"
+HASH_BLOCK = 4 * 1024 * 1024
+
+# Sobe quando o formato do .npz mudar (invalida as entradas antigas)
+CACHE_VERSION = 1
+
+
+# ==============================================================================
+# Cache em disco das probabilidades por janela de cada gravação.
+# A chave junta o conteúdo do EDF, do modelo e do scaler (SHA-256) e os
+# parâmetros de pré-processamento: qualquer mudança gera outra chave e a entrada
+# antiga simplesmente deixa de ser encontrada. Só o pós-processamento (limiar,
+# janelas consecutivas, gráfico) reaproveita o resultado.
+# ==============================================================================
+
+
+def _atomic_write(path: str, write) -> None:
+  # Escreve num temporário e troca de uma vez: leitores nunca veem arquivo pela metade
+  tmp = f"{path}.{os.getpid()}.tmp"
+  write(tmp)
+  os.replace(tmp, path)
+
+
+# ===============================================================================
+# SHA-256 do conteúdo, memorizado por (caminho, tamanho, mtime) no índice do
+# cache: arquivos não modificados não são relidos (só um os.stat). Entradas de
+# arquivos que não existem mais (ex.: EDFs temporários) saem ao regravar o índice
+# ===============================================================================
+def file_sha256(path: str, cache_dir: str = CACHE_DIR) -> str:
+  st = os.stat(path)
+  stamp = [st.st_size, st.st_mtime_ns]
+  index_path = os.path.join(cache_dir, HASH_INDEX)
+  abspath = os.path.abspath(path)
+
+  index = {}
+  if os.path.exists(index_path):
+    try:
+      with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    except (OSError, ValueError):
+      index = {}
+  entry = index.get(abspath)
+  if entry and entry["stamp"] == stamp:
+    return entry["sha256"]
+
+  h = hashlib.sha256()
+  with open(path, "rb") as f:
+    for block in iter(lambda: f.read(HASH_BLOCK), b""):
+      h.update(block)
+  digest = h.hexdigest()
+
+  index = {p: e for p, e in index.items() if os.path.exists(p)}
+  index[abspath] = {"stamp": stamp, "sha256": digest}
+  os.makedirs(cache_dir, exist_ok=True)
+
+  def write(tmp):
+    with open(tmp, "w", encoding="utf-8") as f:
+      json.dump(index, f)
+  _atomic_write(index_path, write)
+  return digest
+
+
+# =================================================================================
+# Chave da gravação: hashes do EDF, modelo e scaler + parâmetros (JSON ordenado).
+# O arquivo do cache é nomeado só pela chave: o mesmo conteúdo com outro nome
+# de EDF (ou baixado para outro caminho) encontra a mesma entrada.
+# edf_digest substitui o hash do EDF quando o conteúdo já é conhecido sem o
+# arquivo em disco (ex.: md5Checksum + tamanho do Drive); edf_path pode ser None
+# =================================================================================
+def cache_key(edf_path: Optional[str], model_file: str, scaler_file: str, params: Dict, cache_dir: str = CACHE_DIR,
+              edf_digest: Optional[str] = None) -> Tuple[str, str]:
+  parts = {
+    "version": CACHE_VERSION,
+    "edf": edf_digest or file_sha256(edf_path, cache_dir),
+    "model": file_sha256(model_file, cache_dir),
+    "scaler": file_sha256(scaler_file, cache_dir),
+    "params": params,
+  }
+  key = hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+  return key, os.path.join(cache_dir, f"{key}.npz")
+
+
+# ===================================================================
+# Lê uma entrada; None se não existir ou estiver corrompida/antiga
+# ===================================================================
+def load_probabilities(path: str) -> Optional[Dict]:
+  if not os.path.exists(path):
+    return None
+  try:
+    with np.load(path) as data:
+      meta = json.loads(str(data["meta"]))
+      if meta.get("version") != CACHE_VERSION:
+        return None
+      return {
+        "probs": data["probs"],
+        "windows": data["windows"].astype(int),
+        "sfreq": meta["sfreq"],
+        "info": meta["info"],
+      }
+  except (OSError, ValueError, KeyError):
+    return None
+
+
+# ===========================================================================
+# Salva probabilidades (float32), janelas (int32, em amostras), sfreq e os
+# tempos de cada estágio; ~6 bytes/janela comprimido
+# ===========================================================================
+def save_probabilities(path: str, probs: np.ndarray, windows: np.ndarray, sfreq: float, info: Dict) -> str:
+  os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+  meta = json.dumps({"version": CACHE_VERSION, "sfreq": float(sfreq), "info": info})
+
+  def write(tmp):
+    with open(tmp, "wb") as f:
+      np.savez_compressed(f, probs=np.asarray(probs, dtype=np.float32),
+                          windows=np.asarray(windows, dtype=np.int32), meta=np.array(meta))
+  _atomic_write(path, write)
+  return path
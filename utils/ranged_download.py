@@ -0,0 +1,190 @@
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import json
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_WORKERS = 8
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF_S = 0.5
+TIMEOUT_S = 60
+STATE_SUFFIX = ".parts"
+
+# Status HTTP que valem nova tentativa (401: o token pode ter expirado e ser renovado)
+RETRY_STATUS = {401, 408, 429, 500, 502, 503, 504}
+
+Headers = Union[Dict[str, str], Callable[[], Dict[str, str]], None]
+
+
+def _headers_fn(headers: Headers) -> Callable[[], Dict[str, str]]:
+  if callable(headers):
+    return headers
+  return lambda: dict(headers or {})
+
+
+# ===========================================================================
+# Descobre o tamanho do arquivo e se o servidor aceita Range (GET bytes=0-0)
+# ===========================================================================
+def probe_size(url: str, headers: Headers = None) -> Tuple[int, bool]:
+  h = _headers_fn(headers)()
+  h["Range"] = "bytes=0-0"
+  with urllib.request.urlopen(urllib.request.Request(url, headers=h), timeout=TIMEOUT_S) as resp:
+    if resp.status == 206:
+      # Content-Range: bytes 0-0/<total>
+      total = resp.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+      if total.isdigit():
+        return int(total), True
+    return int(resp.headers.get("Content-Length", 0)), False
+
+
+# ====================================================
+# Baixa um intervalo [start, end] (inclusivo) de bytes
+# ====================================================
+def _fetch_range(url: str, start: int, end: int, size: int, headers: Dict[str, str]) -> bytes:
+  headers = dict(headers)
+  headers["Range"] = f"bytes={start}-{end}"
+  with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=TIMEOUT_S) as resp:
+    # 200 só é aceitável se o pedaço cobre o arquivo inteiro
+    if resp.status != 206 and not (resp.status == 200 and start == 0 and end == size - 1):
+      raise IOError(f"servidor ignorou Range (HTTP {resp.status})")
+    data = resp.read()
+  if len(data) != end - start + 1:
+    raise IOError(f"pedaço {start}-{end} incompleto: {len(data)} bytes")
+  return data
+
+
+def _load_state(state_path: str, size: int, chunk_size: int) -> set:
+  try:
+    with open(state_path) as f:
+      state = json.load(f)
+  except (OSError, ValueError):
+    return set()
+  # Só retoma se o particionamento for o mesmo do download anterior
+  if state.get("size") != size or state.get("chunk_size") != chunk_size:
+    return set()
+  return set(state.get("done", []))
+
+
+def _save_state(state_path: str, size: int, chunk_size: int, done: set) -> None:
+  tmp = state_path + ".tmp"
+  with open(tmp, "w") as f:
+    json.dump({"size": size, "chunk_size": chunk_size, "done": sorted(done)}, f)
+  os.replace(tmp, state_path)
+
+
+def format_stats(stats: Dict) -> str:
+  return (f"{stats['bytes'] / 1e6:.1f} MB em {stats['seconds']:.2f}s "
+          f"({stats['mb_s']:.1f} MB/s, {stats['chunks']} pedaços, "
+          f"{stats['retries']} novas tentativas, {stats['resumed_chunks']} retomados)")
+
+
+# ==============================================================================
+# Download paralelo por intervalos de bytes para um buffer pré-alocado ou arquivo.
+# - Cada pedaço tem suas próprias tentativas com backoff exponencial.
+# - Com dest, o progresso fica em <dest>.parts e um novo chamado retoma de onde parou.
+# Retorna (bytes | caminho, estatísticas com MB/s).
+# ==============================================================================
+def download_ranges(url: str, size: Optional[int] = None, dest: Optional[str] = None,
+                    headers: Headers = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    workers: int = DEFAULT_WORKERS, retries: int = DEFAULT_RETRIES,
+                    backoff_s: float = DEFAULT_BACKOFF_S, resume: bool = True) -> Tuple[Union[bytes, str], Dict]:
+  get_headers = _headers_fn(headers)
+  t0 = time.perf_counter()
+
+  if size is None:
+    size, ranged = probe_size(url, get_headers)
+    if not ranged:
+      # Servidor sem suporte a Range: um único pedaço com o arquivo inteiro
+      chunk_size = max(size, 1)
+
+  ranges: List[Tuple[int, int, int]] = [
+    (i, start, min(start + chunk_size, size) - 1)
+    for i, start in enumerate(range(0, size, chunk_size))
+  ]
+
+  done: set = set()
+  state_path = None
+  fd = None
+  buf = None
+  write_lock = threading.Lock()
+
+  if dest is not None:
+    state_path = dest + STATE_SUFFIX
+    if resume and os.path.exists(dest):
+      done = _load_state(state_path, size, chunk_size)
+    fd = os.open(dest, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+    os.ftruncate(fd, size)
+  else:
+    buf = bytearray(size)
+  view = memoryview(buf) if buf is not None else None
+
+  def write(offset: int, data: bytes) -> None:
+    if view is not None:
+      view[offset:offset + len(data)] = data
+    elif hasattr(os, "pwrite"):
+      os.pwrite(fd, data, offset)
+    else:
+      with write_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+  stats = {"bytes": 0, "chunks": len(ranges), "retries": 0, "resumed_chunks": len(done)}
+  state_lock = threading.Lock()
+  # Sinal de parada: depois de uma falha definitiva, ninguém tenta (nem espera) mais
+  stop = threading.Event()
+
+  def fetch(idx: int, start: int, end: int) -> None:
+    for attempt in range(retries + 1):
+      if stop.is_set():
+        return
+      try:
+        data = _fetch_range(url, start, end, size, get_headers())
+        break
+      except urllib.error.HTTPError as e:
+        if e.code not in RETRY_STATUS or attempt == retries:
+          raise
+      except (urllib.error.URLError, socket.timeout, ConnectionError, IOError):
+        if attempt == retries:
+          raise
+      with state_lock:
+        stats["retries"] += 1
+      if stop.wait(backoff_s * (2 ** attempt)):
+        return
+
+    write(start, data)
+    with state_lock:
+      stats["bytes"] += len(data)
+      done.add(idx)
+      if state_path is not None:
+        _save_state(state_path, size, chunk_size, done)
+
+  pending = [r for r in ranges if r[0] not in done]
+  try:
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending) or 1))) as pool:
+      futures = [pool.submit(fetch, *r) for r in pending]
+      try:
+        for fut in as_completed(futures):
+          fut.result()
+      except BaseException:
+        # Falha definitiva: descarta os pedaços na fila e só espera os que já
+        # estão em andamento (o .parts guarda os concluídos para a retomada)
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+  finally:
+    if fd is not None:
+      os.close(fd)
+
+  if state_path is not None and os.path.exists(state_path):
+    os.remove(state_path)
+
+  stats["seconds"] = time.perf_counter() - t0
+  stats["mb_s"] = stats["bytes"] / 1e6 / max(stats["seconds"], 1e-9)
+  if dest is not None:
+    return dest, stats
+  return bytes(buf), stats